@@ -1,19 +1,33 @@
 import os
-import google.generativeai as genai
-from dotenv import load_dotenv
+import itertools
 import PyPDF2
 from datetime import date, timedelta    
 import uuid
 import ast
 from flask import Flask, request, jsonify, send_from_directory, render_template
-import os
+from extraction_client import ExtractionClient
+from prompt_budget import condense, DEFAULT_TOKEN_BUDGET
 
 weekdays_short = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
 
 app = Flask(__name__)
+# generated .ics files are written here for /download; uploaded PDFs are never saved
 UPLOAD_FOLDER = './uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# werkzeug answers 413 from Content-Length / the body stream before the form is parsed
+app.config["MAX_CONTENT_LENGTH"] = int(os.getenv("GEMINI_MAX_REQUEST_BYTES", str(100 * 1024 * 1024)))
+MAX_FILE_BYTES = int(os.getenv("GEMINI_MAX_FILE_BYTES", str(25 * 1024 * 1024)))
+# text extraction stops after this many pages / characters per PDF
+PDF_MAX_PAGES = int(os.getenv("GEMINI_PDF_MAX_PAGES", "300"))
+PDF_MAX_CHARS = int(os.getenv("GEMINI_PDF_MAX_CHARS", "1000000"))
+
+# built once per process; the Gemini model itself is created on first use
+extraction = ExtractionClient(max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "4")))
+PROMPT_TOKEN_BUDGET = int(os.getenv("GEMINI_PROMPT_TOKEN_BUDGET", str(DEFAULT_TOKEN_BUDGET)))
+# running totals for /stats: estimated syllabus tokens seen vs. actually sent
+prompt_stats = {"files": 0, "tokens_in": 0, "tokens_sent": 0, "tokens_dropped": 0}
+
 
 def formatICalendarEvent(event_name, dayList, start_time, end_time, location, num_weeks):
     today = date.today()
@@ -66,77 +80,111 @@ def index():
 def download_ics(filename):
     return send_from_directory(UPLOAD_FOLDER, filename, as_attachment=True)
 
-@app.route('/upload', methods=['POST'])
-def upload_pdf():
-    load_dotenv()
-    try:
-        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-    except Exception as e:
-        return jsonify({"error": f"Error configuring Google Generative AI: {e}"}), 500
+def _file_size(file):
+    stream = file.stream
+    pos = stream.tell()
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(pos)
+    return size
 
-    model = genai.GenerativeModel('gemini-2.0-flash')
-    chat = model.start_chat(history=[])
+def _pdf_text(stream):
+    # read from the upload stream itself (werkzeug spools large files to a temp file)
+    reader = PyPDF2.PdfReader(stream)
+    parts, chars = [], 0
+    for page in itertools.islice(reader.pages, PDF_MAX_PAGES):
+        parts.append(page.extract_text() or "")
+        chars += len(parts[-1]) + 1
+        if chars >= PDF_MAX_CHARS:
+            break
+    return "\n".join(parts)[:PDF_MAX_CHARS]
 
+@app.route('/upload', methods=['POST'])
+def upload_pdf():
     files = request.files.getlist('file')
     if not files or files[0].filename == '':
         return jsonify({"error": "No files uploaded"}), 400
-    results = []
-    for file in files:
+    too_big = [f.filename for f in files if _file_size(f) > MAX_FILE_BYTES]
+    if too_big:
+        return jsonify({"error": f"Files over {MAX_FILE_BYTES} bytes: {', '.join(too_big)}"}), 413
+
+    # pass 1: pull text out of every PDF; slots left as None are already answered
+    results = [None] * len(files)
+    texts = {}
+    budgets = {}
+    for i, file in enumerate(files):
         if file and file.filename.endswith('.pdf'):
-            filepath = os.path.join(UPLOAD_FOLDER, file.filename)
-            file.save(filepath)
             try:
-                pdf_reader = PyPDF2.PdfReader(filepath)
-                pdf_text = ""
-                for page in pdf_reader.pages:
-                    pdf_text += page.extract_text()
-                user_input = pdf_text
-                if not user_input.strip():
-                    results.append({"filename": file.filename, "error": "Empty PDF or no text extracted."})
-                    continue
-                response = chat.send_message(
-                    "Please read this syllabus and find me the days that I have class and where, and the start times and end times on those specific days. Please give your response in the format: "
-                    "Class Name; [Day of the Week 1 (e.g., Monday = 0, Sunday = 6), Second Day of the Week (if applicable),... n-th Day of the Week]; Start Time (HHMMSS); End Time (HHMMSS); Location, and Number of Weeks the class meets (try your best to estimate if not specified, e.g. look for a final exam date and compare it to today's date)."
-                    "Give each component separately. Don't add anything extra.  Here is the syllabus text: " + user_input,
-                    stream=True
-                )
-                full_response = ""
-                for chunk in response:
-                    full_response += chunk.text
-                array = full_response.split("; ")
-                if len(array) < 5:
-                    results.append({"filename": file.filename, "error": "Response not in expected format", "response": full_response})
+                pdf_text = _pdf_text(file.stream)
+                if not pdf_text.strip():
+                    results[i] = {"filename": file.filename, "error": "Empty PDF or no text extracted."}
                     continue
-                event_name = array[0] + " Lecture"
-                try:
-                    dayList = ast.literal_eval(array[1])
-                    if not isinstance(dayList, list):
-                        raise ValueError
-                except Exception:
-                    results.append({"filename": file.filename, "error": "Could not parse day list", "dayList": array[1]})
-                    continue
-                start_time = array[2]
-                end_time = array[3]
-                location = array[4]
-                num_weeks = int(array[5]) if len(array) > 5 else 10
-                iCal_text = formatICalendarEvent(event_name, dayList, start_time, end_time, location, num_weeks)
-                file_name = event_name.replace(" ", "_") + "_Weekly.ics"
-                ics_path = os.path.join(UPLOAD_FOLDER, file_name)
-                with open(ics_path, 'w') as f:
-                    f.write(iCal_text)
-                results.append({
-                    "filename": file.filename,
-                    "event_name": event_name,
-                    "ical_file": file_name,
-                    "ical_text": iCal_text,
-                    "response": full_response
-                })
+                # only the lines relevant to class meetings, capped to the token budget
+                condensed = condense(pdf_text, PROMPT_TOKEN_BUDGET)
+                texts[i] = condensed.text
+                budgets[i] = condensed
+                prompt_stats["files"] += 1
+                prompt_stats["tokens_in"] += condensed.tokens_in
+                prompt_stats["tokens_sent"] += condensed.tokens_kept
+                prompt_stats["tokens_dropped"] += condensed.tokens_dropped
             except Exception as e:
-                results.append({"filename": file.filename, "error": str(e)})
+                results[i] = {"filename": file.filename, "error": str(e)}
         else:
-            results.append({"filename": file.filename, "error": "Invalid file type"})
+            results[i] = {"filename": file.filename, "error": "Invalid file type"}
+
+    # pass 2: one independent model call per file, all in flight together
+    responses = dict(zip(texts, extraction.extract_many_sync(list(texts.values()))))
+
+    # pass 3: turn each response into an .ics
+    for i, full_response in responses.items():
+        file = files[i]
+        if isinstance(full_response, Exception):
+            results[i] = {"filename": file.filename, "error": str(full_response)}
+            continue
+        try:
+            results[i] = _build_result(file.filename, full_response)
+        except Exception as e:
+            results[i] = {"filename": file.filename, "error": str(e)}
+    for i, condensed in budgets.items():
+        results[i]["prompt_tokens"] = condensed.tokens_kept
+        results[i]["tokens_dropped"] = condensed.tokens_dropped
     return jsonify(results)
 
+@app.route('/stats')
+def stats():
+    return jsonify({
+        "prompt": prompt_stats,
+        "cache": {"hits": extraction.hits, "misses": extraction.misses},
+    })
+
+def _build_result(filename, full_response):
+    array = full_response.split("; ")
+    if len(array) < 5:
+        return {"filename": filename, "error": "Response not in expected format", "response": full_response}
+    event_name = array[0] + " Lecture"
+    try:
+        dayList = ast.literal_eval(array[1])
+        if not isinstance(dayList, list):
+            raise ValueError
+    except Exception:
+        return {"filename": filename, "error": "Could not parse day list", "dayList": array[1]}
+    start_time = array[2]
+    end_time = array[3]
+    location = array[4]
+    num_weeks = int(array[5]) if len(array) > 5 else 10
+    iCal_text = formatICalendarEvent(event_name, dayList, start_time, end_time, location, num_weeks)
+    file_name = event_name.replace(" ", "_") + "_Weekly.ics"
+    ics_path = os.path.join(UPLOAD_FOLDER, file_name)
+    with open(ics_path, 'w') as f:
+        f.write(iCal_text)
+    return {
+        "filename": filename,
+        "event_name": event_name,
+        "ical_file": file_name,
+        "ical_text": iCal_text,
+        "response": full_response
+    }
+
 if __name__ == '__main__':
     app.run(debug=True)
 
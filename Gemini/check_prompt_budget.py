@@ -0,0 +1,138 @@
+# Gemini/check_prompt_budget.py
+# Accuracy check for prompt_budget.condense on a synthetic fixture corpus.
+# A local rule-based stand-in for the model answers from the full text and
+# from the condensed text; condensing must not lose any field it got right.
+# The stand-in has its own readers (not prompt_budget's regexes), and half the
+# fixtures phrase the meeting and room in prose the line heuristics weren't
+# written around, among distractors that score high (office hours, due dates).
+#
+#   cd Gemini && python check_prompt_budget.py [--budget 2000]
+import argparse
+import json
+import random
+import re
+
+from prompt_budget import condense
+
+FILLER = [
+    "Students are expected to attend every class and participate in discussion.",
+    "Late work loses 10% per day unless an extension is granted in advance.",
+    "Readings are listed by week and should be completed before lecture.",
+    "Grading: homework 30%, quizzes 10%, midterm 25%, final 35%.",
+    "Academic integrity violations will be reported to the dean of students.",
+    "Accommodations are available through the disability resource center.",
+]
+DAYS = {"Mon": 0, "Tue": 1, "Wed": 2, "Thu": 3, "Fri": 4}
+DAY_WORDS = {"Mon": "Mondays", "Tue": "Tuesdays", "Wed": "Wednesdays", "Thu": "Thursdays", "Fri": "Fridays"}
+BUILDINGS = ["Kline", "Baker", "Olin", "Rhodes"]
+
+
+def _clock12(h: int, m: int) -> str:
+    return f"{h % 12 or 12}" + (f":{m:02d}" if m else "")
+
+
+def fixture(seed: int, n_filler: int, n_distractors: int) -> tuple[str, dict]:
+    """One syllabus with known answers, the meeting details buried in filler and distractors."""
+    rng = random.Random(seed)
+    name = f"CHM {200 + seed} Organic Chemistry"
+    days = rng.choice([("Mon", "Wed"), ("Tue", "Thu"), ("Mon", "Wed", "Fri")])
+    # start and end on the same side of noon, so the prose form needs one am/pm
+    h = rng.choice([8, 9, 10, 13, 14, 15, 16])
+    if seed % 2 == 0:
+        room = f"Room {rng.randint(100, 499)}"
+        meeting = [f"Lectures: {'/'.join(days)} {h}:00 - {h + 1}:15", f"Location: {room}, Science Hall"]
+    else:
+        room = f"{rng.choice(BUILDINGS)} {rng.randint(100, 499)}"
+        words = [DAY_WORDS[d] for d in days]
+        when = ", ".join(words[:-1]) + " and " + words[-1]
+        meeting = [f"The class meets {when}, {_clock12(h, 0)} to {_clock12(h + 1, 15)} {'pm' if h >= 12 else 'am'}.",
+                   f"Sessions take place in {room}."]
+    lines = [f"Course: {name}", f"Instructor: Dr. {rng.choice(['Lee', 'Patel', 'Garcia'])}"]
+    body = [rng.choice(FILLER) for _ in range(n_filler)]
+    for k in range(n_distractors):
+        if k % 4 == 0:
+            d = rng.choice(list(DAYS))
+            body.append(f"Office hours: {d} {rng.randint(9, 16)}:00 - {rng.randint(9, 16)}:30 in Room {rng.randint(10, 99)}")
+        else:
+            body.append(f"Problem set {k} due Oct {rng.randint(1, 28)}, 2025 at 11:59 PM on the course site")
+    rng.shuffle(body)
+    for ln in meeting:
+        # the two meeting lines land apart, so neither rides along as the other's context
+        at = rng.randint(0, len(body))
+        body[at:at] = [ln]
+    lines += body + ["Final exam: Dec 12, 2025 9:00 AM"]
+    truth = {"name": name, "days": [DAYS[d] for d in days], "start": f"{h:02d}0000",
+             "end": f"{h + 1:02d}1500", "location": room}
+    return "\n".join(lines), truth
+
+
+# the stand-in's own readers; deliberately independent of prompt_budget / line_classifier
+_SHORT_MEET = re.compile(r"\b((?:Mon|Tue|Wed|Thu|Fri)(?:/(?:Mon|Tue|Wed|Thu|Fri))*)\s+(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})")
+_PROSE_MEET = re.compile(
+    r"\b((?:Mon|Tues|Wednes|Thurs|Fri)days(?:(?:,\s*|\s+and\s+)(?:Mon|Tues|Wednes|Thurs|Fri)days)*),?\s+"
+    r"(\d{1,2})(?::(\d{2}))?\s+to\s+(\d{1,2})(?::(\d{2}))?\s*([ap]m)\b", re.I)
+_ROOM = re.compile(r"\bRoom \d{3}\b|\b(?:take place|meets?|held) in ([A-Z][a-z]+ \d{3})\b")
+
+
+def fake_model(text: str) -> dict:
+    """Rule-based stand-in for Gemini: reads the same fields the prompt asks for."""
+    name = re.search(r"Course:\s*(.+)", text)
+    out = {"name": name.group(1).strip() if name else None, "days": None, "start": None,
+           "end": None, "location": None}
+    for ln in text.splitlines():
+        if "office" in ln.lower():
+            continue
+        m = _SHORT_MEET.search(ln)
+        if m and out["days"] is None:
+            out["days"] = [DAYS[d] for d in m.group(1).split("/")]
+            out["start"] = f"{int(m.group(2)):02d}{m.group(3)}00"
+            out["end"] = f"{int(m.group(4)):02d}{m.group(5)}00"
+        m = _PROSE_MEET.search(ln)
+        if m and out["days"] is None:
+            out["days"] = [DAYS[w[:3].title()] for w in re.findall(r"[A-Za-z]+days", m.group(1))]
+            pm = 12 if m.group(6).lower() == "pm" else 0
+            out["start"] = f"{int(m.group(2)) % 12 + pm:02d}{m.group(3) or '00'}00"
+            out["end"] = f"{int(m.group(4)) % 12 + pm:02d}{m.group(5) or '00'}00"
+        m = _ROOM.search(ln)
+        if m and out["location"] is None:
+            out["location"] = m.group(1) or m.group(0)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--budget", type=int, default=2000)
+    ap.add_argument("--docs", type=int, default=60)
+    args = ap.parse_args()
+
+    fields = ["name", "days", "start", "end", "location"]
+    full_ok = cond_ok = total = tokens_in = tokens_kept = 0
+    lost = []
+    for seed in range(args.docs):
+        text, truth = fixture(seed, n_filler=50 + seed * 40, n_distractors=20 + seed * 5)
+        c = condense(text, args.budget)
+        full, cond = fake_model(text), fake_model(c.text)
+        for f in fields:
+            total += 1
+            full_ok += full[f] == truth[f]
+            cond_ok += cond[f] == truth[f]
+            assert full[f] == truth[f], f"doc {seed}: the stand-in misread {f} in the full text"
+            if cond[f] != truth[f]:
+                lost.append(f"doc {seed}: {f}")
+        tokens_in += c.tokens_in
+        tokens_kept += c.tokens_kept
+
+    print(json.dumps({
+        "docs": args.docs,
+        "token_budget": args.budget,
+        "accuracy_full_text": round(full_ok / total, 4),
+        "accuracy_condensed": round(cond_ok / total, 4),
+        "tokens_in": tokens_in,
+        "tokens_sent": tokens_kept,
+        "tokens_dropped_pct": round(100 * (1 - tokens_kept / tokens_in), 1),
+    }, indent=2))
+    assert not lost, "condensing lost: " + ", ".join(lost)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# Gemini/extraction_client.py
+# Reusable Gemini client for syllabus extraction: one model per process,
+# stateless per-file calls, bounded concurrency and a response cache.
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Union
+
+MODEL_NAME = 'gemini-2.0-flash'
+
+PROMPT = (
+    "Please read this syllabus and find me the days that I have class and where, and the start times and end times on those specific days. Please give your response in the format: "
+    "Class Name; [Day of the Week 1 (e.g., Monday = 0, Sunday = 6), Second Day of the Week (if applicable),... n-th Day of the Week]; Start Time (HHMMSS); End Time (HHMMSS); Location, and Number of Weeks the class meets (try your best to estimate if not specified, e.g. look for a final exam date and compare it to today's date)."
+    "Give each component separately. Don't add anything extra.  Here is the syllabus text: "
+)
+
+
+def _build_gemini_model(model_name: str):
+    # imported here so a fake model can be used without the SDK installed
+    import google.generativeai as genai
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    return genai.GenerativeModel(model_name)
+
+
+class ExtractionClient:
+    """
+    Sends one independent generate_content call per syllabus (no shared chat
+    history), at most `max_concurrency` at a time, and caches responses by a
+    hash of prompt + extracted text.
+
+    `model` can be any object with `generate_content_async(prompt)` or
+    `generate_content(prompt)` returning something with `.text`, so a local
+    fake can stand in for Gemini. Without one, the Gemini model is built once,
+    on first use.
+    """
+
+    def __init__(self, model=None, model_name: str = MODEL_NAME, max_concurrency: int = 4,
+                 cache_size: int = 256):
+        self._model = model
+        self.model_name = model_name
+        self.max_concurrency = max_concurrency
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def model(self):
+        with self._lock:
+            if self._model is None:
+                self._model = _build_gemini_model(self.model_name)
+            return self._model
+
+    @staticmethod
+    def cache_key(text: str) -> str:
+        return hashlib.sha256((PROMPT + text).encode("utf-8")).hexdigest()
+
+    def _cached(self, key: str) -> Optional[str]:
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return hit
+
+    def _remember(self, key: str, response: str) -> None:
+        with self._lock:
+            self._cache[key] = response
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    async def _call(self, prompt: str) -> str:
+        model = self.model
+        if hasattr(model, "generate_content_async"):
+            response = await model.generate_content_async(prompt)
+        else:
+            response = await asyncio.to_thread(model.generate_content, prompt)
+        return response.text
+
+    async def extract(self, text: str, semaphore: Optional[asyncio.Semaphore] = None) -> str:
+        """Model response for one syllabus text."""
+        key = self.cache_key(text)
+        hit = self._cached(key)
+        if hit is not None:
+            return hit
+        if semaphore is None:
+            response = await self._call(PROMPT + text)
+        else:
+            async with semaphore:
+                response = await self._call(PROMPT + text)
+        self._remember(key, response)
+        return response
+
+    def _semaphore_for_running_loop(self) -> asyncio.Semaphore:
+        if asyncio.get_running_loop() is self._loop:
+            if self._semaphore is None:
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            return self._semaphore
+        # caller-owned loop: the bound applies per batch
+        return asyncio.Semaphore(self.max_concurrency)
+
+    async def extract_many(self, texts: List[str]) -> List[Union[str, Exception]]:
+        """
+        Responses for several texts, in order, run concurrently. A failed call
+        yields its exception in that slot instead of failing the batch.
+        Identical texts in one batch share a single model call.
+        """
+        semaphore = self._semaphore_for_running_loop()
+        inflight = {}
+        for text in texts:
+            key = self.cache_key(text)
+            if key not in inflight:
+                inflight[key] = asyncio.ensure_future(self.extract(text, semaphore))
+        await asyncio.gather(*inflight.values(), return_exceptions=True)
+        results: List[Union[str, Exception]] = []
+        for text in texts:
+            task = inflight[self.cache_key(text)]
+            results.append(task.exception() or task.result())
+        return results
+
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        # one long-lived loop: the SDK's async client and the semaphore stay bound
+        # to it, and the concurrency bound covers every request in the process
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="gemini-extraction", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def extract_many_sync(self, texts: List[str]) -> List[Union[str, Exception]]:
+        """extract_many() for synchronous callers such as the Flask views."""
+        loop = self._background_loop()
+        return asyncio.run_coroutine_threadsafe(self.extract_many(texts), loop).result()
@@ -0,0 +1,111 @@
+# Gemini/prompt_budget.py
+# Trim syllabus text to the lines that matter for extraction, under a token budget.
+import importlib.util
+import math
+import os
+import re
+from typing import List, NamedTuple
+
+
+def _load_line_classifier():
+    # the backend parser's line heuristics, loaded by file path under a private
+    # name: no sys.path entry, so no top-level `services` package leaks into
+    # this app's imports (line_classifier itself only needs re/typing)
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "..", "backend", "services", "line_classifier.py")
+    spec = importlib.util.spec_from_file_location("_syllacal_line_classifier", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_lc = _load_line_classifier()
+ASSESS_RE, CLOCK_RE, DATE_RE, MEET_RE, WS_RE = _lc.ASSESS_RE, _lc.CLOCK_RE, _lc.DATE_RE, _lc.MEET_RE, _lc.WS_RE
+
+DEFAULT_TOKEN_BUDGET = 2000
+
+LOCATION_RE = re.compile(
+    r"\b(?:room|rm\.?|hall|bldg|building|location|classroom|online|zoom|campus"
+    r"|meets? in|held in|takes? place in|located in)\b", re.I)
+# "2 to 3:15 pm", "10-11:15am": a time range MEET_RE's clock-to-clock form misses
+TIME_RANGE_RE = re.compile(
+    r"\b\d{1,2}(?::\d{2})?\s*(?:[ap]\.?m\.?)?\s*(?:-|–|to|until)\s*\d{1,2}(?::\d{2})?\s*[ap]\.?m\.?", re.I)
+# lines about other sessions; their times aren't the class meeting
+OTHER_SESSION_RE = re.compile(r"\boffice hours?\b|\btutoring\b|\bhelp sessions?\b", re.I)
+DAY_NAME_RE = re.compile(r"\b(?:mon|tue|wed|thu|fri|sat|sun)(?:day|s|nes|rs|ur|urs)?[a-z]*\b", re.I)
+COURSE_RE = re.compile(r"(?i:\bcourse(?: name| title)?\s*:)|\b[A-Z]{2,4}\s?-?\d{3,4}[A-Z]?\b")
+HEADER_LINES = 3  # the class name is usually in the first few lines
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose; good enough for budgeting
+    return math.ceil(len(text) / 4)
+
+
+class Condensed(NamedTuple):
+    text: str
+    lines_total: int
+    lines_kept: int
+    tokens_in: int
+    tokens_kept: int
+
+    @property
+    def tokens_dropped(self) -> int:
+        return self.tokens_in - self.tokens_kept
+
+
+def score_line(ln: str, position: int) -> int:
+    """Relevance of one line to the class-meeting prompt; 0 means filler."""
+    score = 0
+    day_name = DAY_NAME_RE.search(ln)
+    assessment = ASSESS_RE.search(ln)
+    if MEET_RE.search(ln) or (day_name and TIME_RANGE_RE.search(ln)):
+        score += 8
+    elif CLOCK_RE.search(ln) and not assessment:
+        # a clock on a due line is a deadline, not a meeting time
+        score += 3
+    if day_name:
+        score += 1
+    if LOCATION_RE.search(ln):
+        score += 3
+    if position < HEADER_LINES or COURSE_RE.search(ln):
+        score += 3
+    if DATE_RE.search(ln):
+        # dates matter mostly for "number of weeks" (first class / final exam)
+        score += 2 if assessment else 1
+    if score and OTHER_SESSION_RE.search(ln):
+        return 1
+    return score
+
+
+def condense(text: str, token_budget: int = DEFAULT_TOKEN_BUDGET) -> Condensed:
+    """
+    Keep scored lines (plus one line of context either side) in document order,
+    highest scores first when they don't all fit in `token_budget`. Text that
+    already fits is passed through as-is.
+    """
+    tokens_in = estimate_tokens(text)
+    lines = [ln for ln in (WS_RE.sub(" ", raw).strip() for raw in text.splitlines()) if ln]
+    if tokens_in <= token_budget:
+        return Condensed(text, len(lines), len(lines), tokens_in, tokens_in)
+
+    scores = [score_line(ln, i) for i, ln in enumerate(lines)]
+    priority = {}
+    for i, s in enumerate(scores):
+        if s:
+            priority[i] = max(priority.get(i, 0), s * 2)
+            for j in (i - 1, i + 1):  # neighbours often carry the room or the time
+                if 0 <= j < len(lines):
+                    priority[j] = max(priority.get(j, 0), 1)
+
+    kept: List[int] = []
+    used = 0
+    for i in sorted(priority, key=lambda i: (-priority[i], i)):
+        cost = estimate_tokens(lines[i]) + 1  # + newline
+        if used + cost > token_budget:
+            continue
+        kept.append(i)
+        used += cost
+    kept.sort()
+    out = "\n".join(lines[i] for i in kept)
+    return Condensed(out, len(lines), len(kept), tokens_in, estimate_tokens(out))
@@ -0,0 +1,79 @@
+# backend/bench/bench_classifier.py
+# Lines/sec of the parse() line pass: the original two-loop regex cascade
+# vs. the precompiled single-pass classifier.
+#
+#   cd backend && python -m bench.bench_classifier [--docs 200] [--lines 400]
+import argparse
+import json
+import re
+import time
+
+from bench.corpus import corpus
+from services.line_classifier import DATE_WORDS, MEET_RE, classify_lines
+
+# DATE_RE as originally written in parse_router (unfactored month alternation)
+LEGACY_DATE_RE = re.compile(rf"({DATE_WORDS}\s+\d{{1,2}}(?:,\s*\d{{4}})?|\d{{1,2}}/\d{{1,2}}(?:/\d{{2,4}})?)", re.I)
+
+
+def legacy_classify(lines):
+    """The pre-classifier loops from parse_router.parse(), minus dateutil."""
+    course_name = next((ln.split("Course:")[1].strip() for ln in lines if "Course:" in ln), None)
+    meetings, dues = [], []
+    for ln in lines:
+        m = MEET_RE.search(ln)
+        if m:
+            days_raw = m.group(1)
+            day_tokens = re.split(r"[/, &-]+", days_raw)
+            day_map = {"M":"Mon","T":"Tue","W":"Wed","R":"Thu","F":"Fri","S":"Sat","U":"Sun"}
+            meetings.append(([day_map.get(d, d) for d in day_tokens], m.group(2), m.group(3)))
+    for ln in lines:
+        if re.search(r"\b(due|deadline|exam|quiz|project|milestone|presentation|final)\b", ln, re.I):
+            date_match = LEGACY_DATE_RE.search(ln)
+            if date_match:
+                time_match = re.search(r"\d{1,2}:\d{2}\s?(?:AM|PM|am|pm)?", ln)
+                title = re.sub(r"\s+", " ", re.sub(LEGACY_DATE_RE, "", ln)).strip()
+                dues.append((date_match.group(1), time_match.group(0) if time_match else None, title))
+    return course_name, meetings, dues
+
+
+def single_pass(lines):
+    course_name, meetings, dues = classify_lines(lines)
+    return course_name, [tuple(m) for m in meetings], [tuple(d) for d in dues]
+
+
+def _lines_per_sec(fn, docs, repeat):
+    total = sum(len(d) for d in docs)
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for d in docs:
+            fn(d)
+        best = min(best, time.perf_counter() - t0)
+    return total / best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, default=200)
+    ap.add_argument("--lines", type=int, default=400)
+    ap.add_argument("--density", type=float, default=0.15)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    docs = corpus(args.docs, args.lines, args.density)
+    for d in docs:
+        assert legacy_classify(d) == single_pass(d), "classifier output diverged from legacy loops"
+
+    before = _lines_per_sec(legacy_classify, docs, args.repeat)
+    after = _lines_per_sec(single_pass, docs, args.repeat)
+    print(json.dumps({
+        "docs": args.docs,
+        "lines_per_doc": args.lines,
+        "legacy_lines_per_sec": round(before),
+        "single_pass_lines_per_sec": round(after),
+        "speedup": round(after / before, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# backend/bench/bench_ics.py
+# Events/sec of /api/ics serialization: the original icalendar object tree
+# vs. services.ics_writer. Also asserts the two produce identical bytes, and
+# that every file of an /ics/batch zip matches /ics for the same calendar.
+#
+#   cd backend && python -m bench.bench_ics [--courses 200]
+import argparse
+import copy
+import io
+import itertools
+import json
+import re
+import time
+import zipfile
+from datetime import datetime, timedelta
+
+import pytz
+from icalendar import Calendar, Event, Alarm
+
+from bench.corpus import ics_payload
+from starlette.requests import Request
+
+from routers import ics_router
+from routers.ics_router import Course, StudyTask, Filters, DOW_MAP, _local_iso_to_dt
+from services import ics_writer
+
+
+def legacy_render(courses, study_tasks, filters, uid, dtstamp: datetime) -> bytes:
+    """make_ics as it was before ics_writer (BYDAY passed as a list, see below)."""
+    cal = Calendar()
+    cal.add("prodid", "-//syllaCal//EN")
+    cal.add("version", "2.0")
+    cal.add("X-WR-CALNAME", "syllaCal")
+
+    def add_alarm(vevent, minutes_before, message="Upcoming event"):
+        alarm = Alarm()
+        alarm.add("action", "DISPLAY")
+        alarm.add("trigger", timedelta(minutes=-minutes_before))
+        alarm.add("description", message)
+        vevent.add_component(alarm)
+
+    if filters.includeLectures:
+        for c in courses:
+            if not filters.courseInclusion.get(c.id, True):
+                continue
+            for mb in c.meeting_blocks:
+                dtstart_local = _local_iso_to_dt(f"{mb.start_date}T{mb.start_local}")
+                dtend_local   = _local_iso_to_dt(f"{mb.start_date}T{mb.end_local}")
+                until_utc = _local_iso_to_dt(f"{mb.end_date}T{mb.end_local}").astimezone(pytz.UTC)
+                ve = Event()
+                ve.add("uid", uid())
+                ve.add("dtstamp", dtstamp)
+                ve.add("dtstart", dtstart_local)
+                ve.add("dtend", dtend_local)
+                # the original joined BYDAY into one string, which icalendar rejects for >1 day
+                byday = [DOW_MAP[d] for d in mb.days if d in DOW_MAP]
+                ve.add("rrule", {"FREQ": "WEEKLY", "BYDAY": byday, "UNTIL": until_utc})
+                ve.add("summary", f"{c.name} Lecture")
+                if mb.location:
+                    ve.add("location", mb.location)
+                ve.add("description", f"Course: {c.name} ({c.id})")
+                add_alarm(ve, 15, "Class starting soon")
+                cal.add_component(ve)
+
+    if filters.includeAssignmentsAndExams:
+        for c in courses:
+            if not filters.courseInclusion.get(c.id, True):
+                continue
+            for a in c.assessments:
+                dt = _local_iso_to_dt(a.due_datetime_local)
+                ve = Event()
+                ve.add("uid", uid())
+                ve.add("dtstamp", dtstamp)
+                ve.add("dtstart", dt)
+                ve.add("dtend", dt + timedelta(hours=1))
+                ve.add("summary", f"{a.title} — {c.name}")
+                if a.location:
+                    ve.add("location", a.location)
+                desc_lines = [f"Category: {a.category}", f"Course: {c.name} ({c.id})"]
+                if a.notes:
+                    desc_lines.append(f"Notes: {a.notes}")
+                ve.add("description", "\n".join(desc_lines))
+                add_alarm(ve, 30, "Due soon")
+                cal.add_component(ve)
+
+    if filters.includeStudySessions != "none":
+        allowed_courses = (
+            set(filters.studyCourses)
+            if filters.includeStudySessions == "selectedCourses"
+            else {c.id for c in courses if filters.courseInclusion.get(c.id, True)}
+        )
+        for s in study_tasks:
+            if s.course_id not in allowed_courses:
+                continue
+            ve = Event()
+            ve.add("uid", uid())
+            ve.add("dtstamp", dtstamp)
+            ve.add("dtstart", _local_iso_to_dt(s.start_local))
+            ve.add("dtend", _local_iso_to_dt(s.end_local))
+            ve.add("summary", f"Study — {s.title}")
+            desc = f"Course: {s.course_id}"
+            if s.related_assessment:
+                desc += f"\nRelated: {s.related_assessment}"
+            if s.notes:
+                desc += f"\nNotes: {s.notes}"
+            ve.add("description", desc)
+            add_alarm(ve, 10, "Study session starting")
+            cal.add_component(ve)
+
+    return cal.to_ical()
+
+
+def _counter_uid():
+    n = itertools.count()
+    return lambda *_identity: f"{next(n):08d}@syllacal"
+
+
+def check_batch() -> int:
+    """Each /ics/batch entry == /ics for the same calendar, with no repeated UID in a file."""
+    base = ics_payload(4, 5, 3)
+    a, b, c, d = base["courses"]
+    renamed = {**copy.deepcopy(b), "name": "Same id, other content"}
+    no_study = {**base["filters"], "includeStudySessions": "none"}
+    calendars = [
+        {"name": "plain", "courses": [a, b, c], "study_tasks": base["study_tasks"], "filters": base["filters"]},
+        {"name": "shares courses", "courses": [b, c, d], "study_tasks": [], "filters": no_study},
+        {"name": "course listed twice", "courses": [a, b, a], "study_tasks": base["study_tasks"],
+         "filters": base["filters"]},
+        {"name": "id reused", "courses": [b, renamed], "study_tasks": [], "filters": base["filters"]},
+    ]
+    request = Request({"type": "http", "method": "POST", "path": "/api/ics", "headers": [], "query_string": b""})
+    resp = ics_router.make_ics_batch({"calendars": calendars})
+    with zipfile.ZipFile(io.BytesIO(resp.body)) as zf:
+        files = [zf.read(n) for n in sorted(zf.namelist())]
+    for cal, got in zip(calendars, files):
+        body = {k: cal[k] for k in ("courses", "study_tasks", "filters")}
+        assert got == ics_router.make_ics(body, request).body, f"batch differs from /ics: {cal['name']}"
+        uids = re.findall(rb"^UID:(.*)\r$", got, re.M)
+        assert len(uids) == len(set(uids)), f"repeated UID in {cal['name']}"
+    return len(files)
+
+
+def _best(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--courses", type=int, default=200)
+    ap.add_argument("--assessments", type=int, default=20)
+    ap.add_argument("--study", type=int, default=10)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    payload = ics_payload(args.courses, args.assessments, args.study)
+    courses = [Course(**c) for c in payload["courses"]]
+    study_tasks = [StudyTask(**s) for s in payload["study_tasks"]]
+    filters = Filters(**payload["filters"])
+    now = datetime(2025, 1, 1, 12, 0, 0)
+
+    t_old, old = _best(lambda: legacy_render(courses, study_tasks, filters, _counter_uid(), now), args.repeat)
+    t_new, new = _best(lambda: ics_writer.render(courses, study_tasks, filters, _counter_uid(),
+                                                 now.strftime("%Y%m%dT%H%M%SZ")), args.repeat)
+    assert old == new, "ics_writer output differs from the icalendar path"
+    batch_files = check_batch()
+
+    n_events = new.count(b"BEGIN:VEVENT")
+    print(json.dumps({
+        "events": n_events,
+        "bytes": len(new),
+        "icalendar_events_per_sec": round(n_events / t_old),
+        "ics_writer_events_per_sec": round(n_events / t_new),
+        "speedup": round(t_old / t_new, 2),
+        "batch_files_checked": batch_files,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# backend/bench/bench_scheduler.py
+# Latency of services.study_scheduler for one student's term, plus a brute-force
+# check that no placed session overlaps a lecture, another session or its deadline.
+#
+#   cd backend && python -m bench.bench_scheduler [--courses 8 --assessments 50]
+import argparse
+import json
+import time
+
+import numpy as np
+
+from bench.corpus import ics_payload
+from routers.ics_router import Course, StudyTask
+from services import recurrence, study_scheduler
+
+
+def check(courses, existing, tasks) -> None:
+    lec_start, lec_end, _ = recurrence.lecture_times(
+        courses, np.datetime64("2024-12-01", "D"), np.datetime64("2025-06-30", "D"))
+    busy_s = np.concatenate([lec_start, np.array([s.start_local for s in existing], dtype="datetime64[m]")])
+    busy_e = np.concatenate([lec_end, np.array([s.end_local for s in existing], dtype="datetime64[m]")])
+    ts = np.array([t["start_local"] for t in tasks], dtype="datetime64[m]")
+    te = np.array([t["end_local"] for t in tasks], dtype="datetime64[m]")
+    # every (session, busy) pair and every pair of distinct sessions must be disjoint
+    assert not ((ts[:, None] < busy_e[None, :]) & (busy_s[None, :] < te[:, None])).any(), "session overlaps busy time"
+    clash = (ts[:, None] < te[None, :]) & (ts[None, :] < te[:, None])
+    np.fill_diagonal(clash, False)
+    assert not clash.any(), "sessions overlap each other"
+    due = {(c.id, a.title): a.due_datetime_local for c in courses for a in c.assessments}
+    for t in tasks:
+        assert t["end_local"] <= due[(t["course_id"], t["related_assessment"])], t
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--courses", type=int, default=8)
+    ap.add_argument("--assessments", type=int, default=50, help="per course")
+    ap.add_argument("--existing", type=int, default=10, help="pre-existing study tasks per course")
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    payload = ics_payload(args.courses, args.assessments, args.existing)
+    courses = [Course(**c) for c in payload["courses"]]
+    existing = [StudyTask(**s) for s in payload["study_tasks"]]
+
+    times = []
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        plan = study_scheduler.schedule(courses, existing)
+        times.append(time.perf_counter() - t0)
+    check(courses, existing, plan.study_tasks)
+
+    times.sort()
+    print(json.dumps({
+        "courses": args.courses,
+        "assessments": sum(len(c.assessments) for c in courses),
+        "sessions_placed": len(plan.study_tasks),
+        "sessions_unplaced": sum(u["missing"] for u in plan.unscheduled),
+        "best_ms": round(times[0] * 1e3, 2),
+        "median_ms": round(times[len(times) // 2] * 1e3, 2),
+        "budget_ms": 50,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# backend/bench/bench_startup.py
+# Cold-start cost of one API worker, each sample in a fresh interpreter:
+# `import main` with the heavy dependencies lazy vs. imported up front, the
+# first /api/ics and /api/parse on a cold process, and the same /api/parse
+# after the startup warm-up (services.warmup) has run.
+#
+#   cd backend && python -m bench.bench_startup [--runs 5]
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+HEAVY = ("pdfplumber", "dateutil.parser", "pytz", "numpy")
+
+
+def _ms(t0: float) -> float:
+    return round((time.perf_counter() - t0) * 1e3, 2)
+
+
+def probe(mode: str) -> dict:
+    """One sample, run inside the child interpreter."""
+    out = {}
+    if mode == "eager":
+        # what `import main` used to cost, with every heavy dependency at module level
+        t0 = time.perf_counter()
+        for name in HEAVY:
+            __import__(name)
+        import main  # noqa: F401
+        out["import_main_ms"] = _ms(t0)
+        return out
+
+    t0 = time.perf_counter()
+    import main
+    out["import_main_ms"] = _ms(t0)
+
+    from fastapi.testclient import TestClient
+    from bench.corpus import ics_payload
+    from bench.pdfgen import syllabus_pdf
+    from services import lazy, warmup, workers
+
+    out["loaded_after_import"] = [n for n in HEAVY if lazy.is_loaded(n)]
+    client = TestClient(main.app)  # no `with`: the lifespan (and its warm-up) doesn't run
+    pdf = syllabus_pdf(2, 40, 0.15, seed=0)
+    try:
+        if mode == "cold":
+            t0 = time.perf_counter()
+            assert client.post("/api/ics", json=ics_payload(4, 10, 0)).status_code == 200
+            out["first_ics_ms"] = _ms(t0)
+        else:
+            t0 = time.perf_counter()
+            state = warmup.warm()
+            out["warmup_ms"] = _ms(t0)
+            out["pool_workers"] = state["pool_workers"]
+        t0 = time.perf_counter()
+        r = client.post("/api/parse", files=[("files", ("s.pdf", pdf, "application/pdf"))])
+        assert r.status_code == 200, r.text
+        out["first_parse_ms"] = _ms(t0)
+    finally:
+        workers.shutdown_pool()
+    return out
+
+
+def sample(mode: str) -> dict:
+    env = dict(os.environ, SYLLACAL_PARSE_CACHE_DIR="")
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-m", "bench.bench_startup", "--probe", mode],
+                          capture_output=True, text=True, env=env, check=True)
+    res = json.loads(proc.stdout.strip().splitlines()[-1])
+    res["process_ms"] = _ms(t0)
+    return res
+
+
+def _median(vals):
+    vals = sorted(vals)
+    return vals[len(vals) // 2]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--probe", choices=["eager", "cold", "warm"], help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.probe:
+        print(json.dumps(probe(args.probe)))
+        return
+
+    report = {"python": sys.version.split()[0], "runs": args.runs}
+    for mode in ("eager", "cold", "warm"):
+        runs = [sample(mode) for _ in range(args.runs)]
+        summary = {k: _median([r[k] for r in runs]) for k, v in runs[0].items() if isinstance(v, (int, float))}
+        if "loaded_after_import" in runs[0]:
+            summary["loaded_after_import"] = runs[0]["loaded_after_import"]
+        report[mode] = summary
+    report["import_saved_ms"] = round(report["eager"]["import_main_ms"] - report["cold"]["import_main_ms"], 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# backend/bench/corpus.py
+# Deterministic synthetic syllabus text for benchmarks.
+import random
+from typing import List
+
+MEETING_FORMATS = [
+    "Lecture: {days_slash} {start} {ap} - {end} {ap}",
+    "Class meets {days_letters} {start}-{end}",
+    "{days_comma} {start} {ap} - {end} {ap} in Room {room}",
+    "Section {room}: {days_letters} {start} {ap_lower} - {end} {ap_lower}",
+]
+ASSESSMENT_FORMATS = [
+    "Homework {n} due {mon} {day}",
+    "HW{n} due {m}/{day}",
+    "Quiz {n} {mon} {day} {hour}:{minute} PM",
+    "Midterm exam {m}/{day}/25 {hour}:{minute} AM",
+    "Final project due {month} {day}, 2025",
+    "Project milestone {n} - deadline {mon} {day}",
+    "Group presentation on {m}/{day}",
+]
+FILLER = [
+    "Students are expected to attend every class and participate in discussion.",
+    "Late work loses 10% per day unless an extension is granted in advance.",
+    "Office hours are held weekly; see the course website for the schedule.",
+    "Academic integrity violations will be reported to the dean of students.",
+    "Readings are listed by week and should be completed before lecture.",
+    "Grading: homework 30%, quizzes 10%, midterm 25%, final 35%.",
+    "Accommodations are available through the disability resource center.",
+    "Week {n}: introduction to the topic and review of prerequisites.",
+]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Sep", "Oct", "Nov", "Dec"]
+LONG_MONTHS = ["January", "February", "March", "April", "September", "October", "November"]
+DAY_SETS = [("Mon", "Wed"), ("Tue", "Thu"), ("Mon", "Wed", "Fri"), ("Fri",)]
+LETTERS = {"Mon": "M", "Tue": "T", "Wed": "W", "Thu": "R", "Fri": "F"}
+
+
+def syllabus_lines(n_lines: int, assessment_density: float = 0.15, seed: int = 0) -> List[str]:
+    """
+    One synthetic syllabus of roughly n_lines lines: a "Course:" header, a few
+    meeting lines, assessments at the given density and filler prose otherwise.
+    """
+    rng = random.Random(seed)
+    out = [f"Course: CS {100 + seed % 400} Topics in Computing {seed}"]
+    for _ in range(rng.randint(1, 3)):
+        days = rng.choice(DAY_SETS)
+        h = rng.randint(8, 11)
+        out.append(rng.choice(MEETING_FORMATS).format(
+            days_slash="/".join(days), days_comma=", ".join(days),
+            days_letters=" ".join(LETTERS[d] for d in days),
+            start=f"{h}:{rng.choice(['00', '30'])}", end=f"{h + 1}:{rng.choice(['15', '45'])}",
+            ap="AM", ap_lower="am", room=rng.randint(100, 499),
+        ))
+    n = 1
+    while len(out) < n_lines:
+        if rng.random() < assessment_density:
+            out.append(rng.choice(ASSESSMENT_FORMATS).format(
+                n=n, mon=rng.choice(MONTHS), month=rng.choice(LONG_MONTHS),
+                m=rng.randint(1, 12), day=rng.randint(1, 28),
+                hour=rng.randint(1, 11), minute=rng.choice(["00", "15", "30", "45"]),
+            ))
+            n += 1
+        else:
+            out.append(rng.choice(FILLER).format(n=n))
+    return out
+
+
+def corpus(n_docs: int, n_lines: int, assessment_density: float = 0.15) -> List[List[str]]:
+    return [syllabus_lines(n_lines, assessment_density, seed=i) for i in range(n_docs)]
+
+
+def ics_payload(n_courses: int, assessments_per_course: int = 20, study_per_course: int = 10,
+                seed: int = 0) -> dict:
+    """A /api/ics request body with n_courses synthetic courses."""
+    rng = random.Random(seed)
+    courses, tasks = [], []
+    for i in range(n_courses):
+        cid = f"CS-{100 + i}"
+        days = list(rng.choice(DAY_SETS))
+        h = rng.randint(8, 16)
+        courses.append({
+            "id": cid,
+            "name": f"CS {100 + i} Topics in Computing, Section {rng.randint(1, 9)}",
+            "meeting_blocks": [{
+                "days": days, "start_local": f"{h:02d}:30", "end_local": f"{h + 1:02d}:45",
+                "start_date": "2025-01-06", "end_date": "2025-04-25",
+                "location": rng.choice(["", f"Room {rng.randint(100, 499)}, Hall B"]), "type": "lecture",
+            }],
+            "assessments": [{
+                "title": f"{rng.choice(['Homework', 'Quiz', 'Project milestone', 'Exam'])} {j + 1}",
+                "due_datetime_local": f"2025-{rng.randint(1, 4):02d}-{rng.randint(1, 28):02d}T{rng.randint(8, 23):02d}:{rng.choice(['00', '30', '59'])}",
+                "category": rng.choice(["assignment", "exam", "project", "quiz", "milestone"]),
+                "location": rng.choice(["", "Online; submit via LMS"]),
+                "notes": rng.choice(["", "Covers chapters 1-4, closed book; bring a calculator and a pencil and your student ID"]),
+            } for j in range(assessments_per_course)],
+        })
+        for j in range(study_per_course):
+            d = rng.randint(1, 28)
+            tasks.append({
+                "course_id": cid, "title": f"Review for {cid} item {j + 1}",
+                "start_local": f"2025-03-{d:02d}T19:00", "end_local": f"2025-03-{d:02d}T21:00",
+                "related_assessment": f"Exam {j + 1}" if j % 2 else None, "notes": None,
+            })
+    return {
+        "courses": courses,
+        "study_tasks": tasks,
+        "filters": {
+            "includeLectures": True, "includeAssignmentsAndExams": True,
+            "includeStudySessions": "all", "studyCourses": [], "courseInclusion": {},
+        },
+    }
@@ -0,0 +1,54 @@
+# backend/bench/pdfgen.py
+# Minimal single-font PDF writer for synthetic syllabi; no dependencies, and
+# pdfplumber extracts the lines back in order.
+from typing import List
+
+from bench.corpus import syllabus_lines
+
+TERMS = ["Spring 2025", "Fall 2025", "Summer 2025", ""]
+
+
+def _escape(s: str) -> str:
+    s = s.encode("latin-1", "replace").decode("latin-1")
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """A PDF with one text page per entry in `pages`, one line per string."""
+    n = len(pages)
+    font_id = 3 + 2 * n
+    objs = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{3 + 2 * i} 0 R' for i in range(n))}] /Count {n} >>".encode(),
+    ]
+    for i, lines in enumerate(pages):
+        objs.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>".encode()
+        )
+        text = "BT /F1 10 Tf 14 TL 50 750 Td " + " ".join(f"({_escape(ln)}) Tj T*" for ln in lines) + " ET"
+        stream = text.encode("latin-1")
+        objs.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objs.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objs, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    return bytes(out)
+
+
+def syllabus_pdf(n_pages: int, lines_per_page: int = 50, assessment_density: float = 0.15,
+                 seed: int = 0) -> bytes:
+    """A synthetic syllabus PDF (see corpus.syllabus_lines) split into pages."""
+    lines = syllabus_lines(n_pages * lines_per_page, assessment_density, seed)
+    term = TERMS[seed % len(TERMS)]
+    if term:
+        lines.insert(1, term)
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+    return make_pdf(pages)
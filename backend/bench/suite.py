@@ -0,0 +1,213 @@
+# backend/bench/suite.py
+# End-to-end benchmark of the parse and export hot paths on synthetic syllabus
+# PDFs: each stage in-process, plus /api/parse and /api/ics through TestClient,
+# and a check that an extraction timeout comes back as 504.
+# Prints one JSON report; with --baseline, flags stages whose p50 regressed.
+#
+#   cd backend && python -m bench.suite [--iterations 20] [--out report.json]
+#   cd backend && python -m bench.suite --baseline report.json [--tolerance 0.25]
+import argparse
+import io
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from bench.pdfgen import syllabus_pdf
+from main import app
+import settings
+from routers import ics_router, parse_router
+from services import lazy, parse_cache, pdf_extract
+
+# name -> (pages, lines per page, assessment density)
+PROFILES: Dict[str, tuple] = {
+    "small": (1, 40, 0.15),
+    "medium": (5, 50, 0.15),
+    "large": (20, 50, 0.15),
+    "medium-sparse": (5, 50, 0.05),
+    "medium-dense": (5, 50, 0.40),
+}
+DOCS_PER_PLAN = 8   # courses in one /api/ics payload, one per synthetic syllabus
+NOW = datetime(2025, 1, 1, 12, 0)
+
+
+def _percentile(sorted_vals: List[float], q: float) -> float:
+    # nearest-rank
+    return sorted_vals[max(0, math.ceil(q * len(sorted_vals)) - 1)]
+
+
+def measure(fn: Callable[[], object], iterations: int, units: Optional[tuple] = None) -> dict:
+    """
+    Latency percentiles over `iterations` timed calls (after one warm-up), then
+    one extra call under tracemalloc for peak Python heap (this process only;
+    /api/parse extracts in the worker pool). `units` is (name, count per call)
+    for a throughput figure alongside calls/sec.
+    """
+    fn()
+    lat = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        lat.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    lat.sort()
+    mean = sum(lat) / len(lat)
+    out = {
+        "iterations": iterations,
+        "p50_ms": round(_percentile(lat, 0.50) * 1e3, 3),
+        "p99_ms": round(_percentile(lat, 0.99) * 1e3, 3),
+        "mean_ms": round(mean * 1e3, 3),
+        "calls_per_sec": round(1 / mean, 2),
+        "peak_kib": round(peak / 1024, 1),
+    }
+    if units:
+        name, count = units
+        out[f"{name}_per_sec"] = round(count / mean, 1)
+    return out
+
+
+def _upload(name: str, data: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename=name)
+
+
+def _ics_request() -> Request:
+    return Request({"type": "http", "method": "POST", "path": "/api/ics", "headers": [], "query_string": b""})
+
+
+def run_profile(client: TestClient, name: str, iterations: int) -> dict:
+    pages, per_page, density = PROFILES[name]
+    pdfs = [syllabus_pdf(pages, per_page, density, seed=i) for i in range(DOCS_PER_PLAN)]
+    pdf, filename = pdfs[0], f"{name}.pdf"
+
+    raw = parse_router._read_pdf(_upload(filename, pdf))
+    lines = parse_router._clean_text(raw)
+    courses = []
+    for i, d in enumerate(pdfs):
+        fn = f"{name}-{i}.pdf"
+        courses.append(parse_router._parse_course(parse_router._clean_text(parse_router._read_pdf(_upload(fn, d))), fn, NOW))
+    payload = {
+        "courses": courses,
+        "study_tasks": parse_router._plan_study(courses),
+        "filters": {
+            "includeLectures": True, "includeAssignmentsAndExams": True,
+            "includeStudySessions": "all", "studyCourses": [], "courseInclusion": {},
+        },
+    }
+    n_events = sum(len(c["meeting_blocks"]) + len(c["assessments"]) for c in courses) + len(payload["study_tasks"])
+
+    def make_ics():
+        ics_router.ics_cache.clear()
+        return ics_router.make_ics(payload, _ics_request())
+
+    def http_parse():
+        parse_cache.cache.clear()
+        r = client.post("/api/parse", files=[("files", (filename, pdf, "application/pdf"))])
+        assert r.status_code == 200, r.text
+
+    def http_ics():
+        ics_router.ics_cache.clear()
+        r = client.post("/api/ics", json=payload)
+        assert r.status_code == 200, r.text
+
+    return {
+        "input": {
+            "pages": pages, "pdf_bytes": len(pdf), "lines": len(lines), "assessment_density": density,
+            "assessments": len(courses[0]["assessments"]), "ics_courses": len(courses), "ics_events": n_events,
+        },
+        "stages": {
+            "read_pdf": measure(lambda: parse_router._read_pdf(_upload(filename, pdf)), iterations,
+                                ("bytes", len(pdf))),
+            "clean_text": measure(lambda: parse_router._clean_text(raw), iterations, ("lines", len(lines))),
+            "parse_lines": measure(lambda: parse_router._parse_course(lines, filename, NOW), iterations,
+                                   ("lines", len(lines))),
+            "make_ics": measure(make_ics, iterations, ("events", n_events)),
+            "http_parse": measure(http_parse, iterations, ("bytes", len(pdf))),
+            "http_ics": measure(http_ics, iterations, ("events", n_events)),
+        },
+    }
+
+
+def check_timeout(client: TestClient) -> dict:
+    """
+    A file past PDF_FILE_TIMEOUT_S must come back as 504, also when the alarm
+    fires inside pdfplumber (which wraps what pdfminer raises). Run after the
+    lifespan's warm-up, so pdfplumber is already imported in the workers, and
+    once in-process on the main thread, where the alarm is armed too.
+    """
+    assert lazy.is_loaded("pdfplumber")
+    pdf = syllabus_pdf(60, 40, 0.15, seed=0)
+    try:
+        pdf_extract._extract_pages(pdf, 0, 60, settings.PDF_MAX_CHARS, 0.001)
+        raise AssertionError("in-process extraction outlived its deadline")
+    except pdf_extract.ExtractTimeout:
+        pass
+    limit, settings.PDF_FILE_TIMEOUT_S = settings.PDF_FILE_TIMEOUT_S, 0.01
+    try:
+        parse_cache.cache.clear()
+        r = client.post("/api/parse", files=[("files", ("slow.pdf", pdf, "application/pdf"))])
+    finally:
+        settings.PDF_FILE_TIMEOUT_S = limit
+    assert r.status_code == 504, (r.status_code, r.text[:200])
+    return {"timeout_status": r.status_code}
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[dict]:
+    """Stages whose p50 grew by more than `tolerance` (0.25 = 25%) over the baseline."""
+    out = []
+    for prof, res in report["profiles"].items():
+        for stage, m in res["stages"].items():
+            old = baseline.get("profiles", {}).get(prof, {}).get("stages", {}).get(stage)
+            if old and m["p50_ms"] > old["p50_ms"] * (1 + tolerance):
+                out.append({"profile": prof, "stage": stage, "baseline_p50_ms": old["p50_ms"],
+                            "p50_ms": m["p50_ms"], "ratio": round(m["p50_ms"] / old["p50_ms"], 2)})
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--iterations", type=int, default=20)
+    ap.add_argument("--profiles", default=",".join(PROFILES), help="comma-separated subset of: " + ", ".join(PROFILES))
+    ap.add_argument("--out", help="also write the report to this file")
+    ap.add_argument("--baseline", help="earlier report to compare p50 latencies against")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    args = ap.parse_args()
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": args.iterations,
+        "profiles": {},
+    }
+    # the context manager runs the app lifespan, so the worker pool is shut down at the end
+    with TestClient(app) as client:
+        for name in args.profiles.split(","):
+            report["profiles"][name] = run_profile(client, name, args.iterations)
+        report["checks"] = check_timeout(client)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            report["regressions"] = compare(report, json.load(fh), args.tolerance)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text + "\n")
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
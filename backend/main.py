@@ -1,8 +1,20 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routers import parse_router, ics_router
+from routers import parse_router, ics_router, feed_router, occurrence_router, study_router, metrics_router, health_router
+from services import metrics, warmup, workers
 
-app = FastAPI(title="syllaCal API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # warm up in the background so the server starts taking requests right away
+    warming = asyncio.create_task(asyncio.to_thread(warmup.warm))
+    yield
+    # let it finish first, so it can't fork a pool after shutdown
+    await warming
+    workers.shutdown_pool()
+
+app = FastAPI(title="syllaCal API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -10,7 +22,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+# added last so it is outermost and times CORS handling too
+app.add_middleware(metrics.TimingMiddleware)
 
 app.include_router(parse_router.router, prefix="/api")
 app.include_router(ics_router.router, prefix="/api")
+app.include_router(feed_router.router, prefix="/api")
+app.include_router(occurrence_router.router, prefix="/api")
+app.include_router(study_router.router, prefix="/api")
+app.include_router(health_router.router, prefix="/api")
+app.include_router(metrics_router.router)
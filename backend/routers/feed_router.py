@@ -0,0 +1,129 @@
+# backend/routers/feed_router.py
+# Subscribable calendar feeds: a stored plan served as GET /api/feeds/{token}.ics
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+from typing import List, Any
+import settings
+from routers.ics_router import Course, StudyTask, Filters, _etag_matches
+from services import ics_writer
+from services.feed_store import get_store, canonical_json, digest
+from services.lru import SizedLRU
+
+router = APIRouter()
+
+# whole feed bodies keyed by (token, version): what polling clients are served from
+feed_bodies = SizedLRU(settings.FEED_CACHE_MAX_BYTES // 2)
+# VEVENT text for one course under one set of filter flags, keyed by content
+course_fragments = SizedLRU(settings.FEED_CACHE_MAX_BYTES // 2)
+
+def _validate(payload: dict) -> tuple[list, list, dict]:
+    # round-trip through the models so the store only ever holds valid plans
+    courses = [Course(**c).model_dump() for c in payload.get("courses", [])]
+    # rows are keyed (token, course_id) and courses are edited by id, so ids must be unique
+    ids = [c["id"] for c in courses]
+    dupes = sorted({i for i in ids if ids.count(i) > 1})
+    if dupes:
+        raise HTTPException(status_code=422, detail=f"Duplicate course ids: {', '.join(dupes)}")
+    study_tasks = [StudyTask(**s).model_dump() for s in payload.get("study_tasks", [])]
+    filters = Filters(**payload["filters"]).model_dump()
+    return courses, study_tasks, filters
+
+def _course_fragment(course: Course, course_digest: str, lectures: bool, assessments: bool,
+                     tasks: List[StudyTask]) -> str:
+    """
+    One course's VEVENTs. Keyed by the course's content digest, its filter flags
+    and its study tasks, so editing one course only re-renders that course.
+    """
+    key = f"{course_digest}|{int(lectures)}{int(assessments)}|{digest(canonical_json([t.model_dump() for t in tasks]))}"
+    text = course_fragments.get(key)
+    if text is None:
+        uid = ics_writer.stable_uids()
+        dtstamp = ics_writer.STABLE_DTSTAMP
+        parts = []
+        if lectures:
+            parts.extend(ics_writer.lecture_vevents(course, uid, dtstamp))
+        if assessments:
+            parts.extend(ics_writer.assessment_vevents(course, uid, dtstamp))
+        parts.extend(ics_writer.study_vevents(tasks, uid, dtstamp))
+        text = "".join(parts)
+        course_fragments.put(key, text, len(text))
+    return text
+
+def _render_feed(token: str) -> tuple[int, bytes]:
+    plan = get_store().load(token)
+    if plan is None:
+        raise HTTPException(status_code=404, detail="Unknown feed")
+    courses = [Course(**sc.data) for sc in plan.courses]
+    filters = Filters(**plan.filters)
+    allowed = ics_writer.study_allowed_courses(courses, filters)
+    tasks_by_course: dict = {}
+    for s in plan.study_tasks:
+        if s["course_id"] in allowed:
+            tasks_by_course.setdefault(s["course_id"], []).append(StudyTask(**s))
+
+    parts = [ics_writer.calendar_header()]
+    for c, sc in zip(courses, plan.courses):
+        included = filters.courseInclusion.get(c.id, True)
+        parts.append(_course_fragment(
+            c, sc.digest,
+            filters.includeLectures and included,
+            filters.includeAssignmentsAndExams and included,
+            tasks_by_course.pop(c.id, []),
+        ))
+    # study tasks for selected course ids that aren't in the plan's course list
+    for tasks in tasks_by_course.values():
+        parts.extend(ics_writer.study_vevents(tasks, ics_writer.stable_uids(), ics_writer.STABLE_DTSTAMP))
+    parts.append(ics_writer.calendar_footer())
+    return plan.version, "".join(parts).encode("utf-8")
+
+# ---------- Routes ----------
+
+@router.post("/feeds")
+def create_feed(payload: dict) -> Any:
+    """
+    Store a plan ({courses, study_tasks, filters}, same shape as POST /ics) and
+    return the feed URL calendar apps can subscribe to.
+    """
+    token = get_store().create(*_validate(payload))
+    return {"token": token, "url": f"/api/feeds/{token}.ics"}
+
+@router.put("/feeds/{token}")
+def replace_feed(token: str, payload: dict) -> Any:
+    if not get_store().replace(token, *_validate(payload)):
+        raise HTTPException(status_code=404, detail="Unknown feed")
+    return {"token": token, "url": f"/api/feeds/{token}.ics"}
+
+@router.put("/feeds/{token}/courses/{course_id}")
+def put_feed_course(token: str, course_id: str, course: dict) -> Any:
+    data = Course(**{**course, "id": course_id}).model_dump()
+    if not get_store().put_course(token, data):
+        raise HTTPException(status_code=404, detail="Unknown feed")
+    return {"token": token, "course_id": course_id}
+
+@router.delete("/feeds/{token}")
+def delete_feed(token: str) -> Any:
+    if not get_store().delete(token):
+        raise HTTPException(status_code=404, detail="Unknown feed")
+    return {"deleted": token}
+
+@router.get("/feeds/{token}.ics")
+def get_feed(token: str, request: Request):
+    """
+    The subscribed calendar. Unchanged plans are served from the body cache
+    (one indexed version lookup per poll) and answer If-None-Match with 304.
+    """
+    version = get_store().version(token)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Unknown feed")
+    etag = f'"{version}.{ics_writer.FORMAT_VERSION}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    body = feed_bodies.get((token, version))
+    if body is None:
+        version, body = _render_feed(token)
+        etag = f'"{version}.{ics_writer.FORMAT_VERSION}"'
+        headers["ETag"] = etag
+        feed_bodies.put((token, version), body, len(body))
+    return Response(content=body, media_type="text/calendar", headers=headers)
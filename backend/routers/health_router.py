@@ -0,0 +1,21 @@
+# backend/routers/health_router.py
+# Liveness and readiness for load balancers / autoscalers.
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from services import warmup
+
+router = APIRouter()
+
+@router.get("/health")
+def health() -> JSONResponse:
+    """
+    Always 200 while the process is serving. `warm` turns true once the startup
+    warm-up has loaded the heavy dependencies and forked the worker pool;
+    `modules` shows which of them are loaded either way.
+    """
+    return JSONResponse(warmup.status())
+
+@router.get("/health/ready")
+def ready() -> JSONResponse:
+    """503 while the warm-up is still running, then 200 (also when it is disabled or failed)."""
+    return JSONResponse(warmup.status(), status_code=200 if warmup.is_ready() else 503)
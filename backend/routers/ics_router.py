@@ -1,12 +1,13 @@
 # backend/routers/ics_router.py
-from fastapi import APIRouter
-from fastapi.responses import Response
+from fastapi import APIRouter, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Literal, Dict, Optional
-from icalendar import Calendar, Event, Alarm
-from datetime import datetime, timedelta
-import pytz
-import uuid
+from datetime import datetime
+import hashlib, io, json, re, zipfile
+import settings
+from services import ics_writer, metrics, workers
+from services.lru import SizedLRU
 
 router = APIRouter()
 
@@ -54,17 +55,7 @@ class Filters(BaseModel):
 
 # ---------- Helpers & constants ----------
 
-TZ = pytz.timezone("America/New_York")
-DOW_MAP = {"Mon":"MO", "Tue":"TU", "Wed":"WE", "Thu":"TH", "Fri":"FR", "Sat":"SA", "Sun":"SU"}
-
-# syllaCal identity
-def _uid() -> str:
-    return f"{uuid.uuid4()}@syllacal"  # <- domain tag uses new name
-
-cal = Calendar()
-cal.add("prodid", "-//syllaCal//EN")
-cal.add("version", "2.0")
-cal.add("X-WR-CALNAME", "syllaCal")  # nice display name in calendar apps
+DOW_MAP = ics_writer.DOW_MAP
 
 def _local_iso_to_dt(dt_str: str) -> datetime:
     """
@@ -73,12 +64,38 @@ def _local_iso_to_dt(dt_str: str) -> datetime:
     """
     # fromisoformat supports "YYYY-MM-DDTHH:MM"
     naive = datetime.fromisoformat(dt_str)
-    return TZ.localize(naive)
+    return ics_writer.tz().localize(naive)
+
+# rendered .ics bodies keyed by payload hash
+ics_cache = SizedLRU(settings.ICS_CACHE_MAX_BYTES)
+
+def _payload_etag(courses: List[Course], study_tasks: List[StudyTask], filters: Filters) -> str:
+    """
+    Strong ETag: sha256 of the validated payload in canonical JSON form, plus the
+    writer format version. `color` is preview-only and doesn't affect the .ics.
+    """
+    canonical = json.dumps({
+        "v": ics_writer.FORMAT_VERSION,
+        "courses": [c.model_dump(exclude={"color"}) for c in courses],
+        "study_tasks": [s.model_dump() for s in study_tasks],
+        "filters": filters.model_dump(),
+    }, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return '"' + hashlib.sha256(canonical.encode()).hexdigest() + '"'
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
 
 # ---------- Route ----------
 
+ICS_HEADERS = {"Content-Disposition": 'attachment; filename="syllacal.ics"'}  # <- new filename
+
 @router.post("/ics")
-def make_ics(payload: dict):
+def make_ics(payload: dict, request: Request, stream: bool = False):
     """
     Body shape:
     {
@@ -87,111 +104,120 @@ def make_ics(payload: dict):
       "filters": Filters
     }
     Returns: text/calendar (.ics) honoring the filters sent by the client.
+    With ?stream=true the calendar is sent chunked as events are generated,
+    instead of being serialized in full first (for large exports).
+
+    Output is deterministic (stable UIDs, fixed DTSTAMP), so the response carries
+    a strong ETag; a matching If-None-Match gets 304 without rendering.
     """
-    courses = [Course(**c) for c in payload.get("courses", [])]
-    study_tasks = [StudyTask(**s) for s in payload.get("study_tasks", [])]
-    filters = Filters(**payload["filters"])
-
-    cal = Calendar()
-    cal.add("prodid", "-//syllaCal//EN")
-    cal.add("version", "2.0")
-    cal.add("X-WR-CALNAME", "syllaCal")  # nice to have for some clients
-
-    def add_alarm(vevent: Event, minutes_before: int, message: str = "Upcoming event"):
-        alarm = Alarm()
-        alarm.add("action", "DISPLAY")
-        alarm.add("trigger", timedelta(minutes=-minutes_before))
-        alarm.add("description", message)
-        vevent.add_component(alarm)
-
-    # ----- Lectures (recurring) -----
-    if filters.includeLectures:
-        for c in courses:
-            if not filters.courseInclusion.get(c.id, True):
-                continue
-            for mb in c.meeting_blocks:
-                # First occurrence uses the start_date with the specified time
-                dtstart_local = _local_iso_to_dt(f"{mb.start_date}T{mb.start_local}")
-                dtend_local   = _local_iso_to_dt(f"{mb.start_date}T{mb.end_local}")
-                # UNTIL must be UTC; use the meeting end time on the final date
-                until_utc = _local_iso_to_dt(f"{mb.end_date}T{mb.end_local}").astimezone(pytz.UTC)
-
-                ve = Event()
-                ve.add("uid", _uid())
-                ve.add("dtstamp", datetime.utcnow())
-                ve.add("dtstart", dtstart_local)
-                ve.add("dtend", dtend_local)
-                byday = ",".join(DOW_MAP[d] for d in mb.days if d in DOW_MAP)
-                ve.add("rrule", {"FREQ": "WEEKLY", "BYDAY": byday, "UNTIL": until_utc})
-                ve.add("summary", f"{c.name} Lecture")
-                if mb.location:
-                    ve.add("location", mb.location)
-                ve.add("description", f"Course: {c.name} ({c.id})")
-                add_alarm(ve, 15, "Class starting soon")
-                cal.add_component(ve)
-
-    # ----- Assessments (single events) -----
-    if filters.includeAssignmentsAndExams:
-        for c in courses:
-            if not filters.courseInclusion.get(c.id, True):
-                continue
-            for a in c.assessments:
-                dt = _local_iso_to_dt(a.due_datetime_local)
-
-                ve = Event()
-                ve.add("uid", _uid())
-                ve.add("dtstamp", datetime.utcnow())
-                # For deadlines we set a 1-hour block at the due time; adjust if you prefer all-day
-                ve.add("dtstart", dt)
-                ve.add("dtend", dt + timedelta(hours=1))
-                ve.add("summary", f"{a.title} — {c.name}")
-                if a.location:
-                    ve.add("location", a.location)
-
-                desc_lines = [
-                    f"Category: {a.category}",
-                    f"Course: {c.name} ({c.id})"
-                ]
-                if a.notes:
-                    desc_lines.append(f"Notes: {a.notes}")
-                ve.add("description", "\n".join(desc_lines))
-
-                add_alarm(ve, 30, "Due soon")
-                cal.add_component(ve)
-
-    # ----- Study sessions (single events) -----
-    if filters.includeStudySessions != "none":
-        allowed_courses = (
-            set(filters.studyCourses)
-            if filters.includeStudySessions == "selectedCourses"
-            else {c.id for c in courses if filters.courseInclusion.get(c.id, True)}
+    with metrics.span("validate"):
+        courses = [Course(**c) for c in payload.get("courses", [])]
+        study_tasks = [StudyTask(**s) for s in payload.get("study_tasks", [])]
+        filters = Filters(**payload["filters"])
+
+    with metrics.span("etag"):
+        etag = _payload_etag(courses, study_tasks, filters)
+    headers = {**ICS_HEADERS, "ETag": etag}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    body = ics_cache.get(etag)
+    if body is not None:
+        return Response(content=body, media_type="text/calendar", headers=headers)
+
+    dtstamp = ics_writer.STABLE_DTSTAMP
+    if stream:
+        # models are validated above, so a bad payload fails before any bytes go out
+        return StreamingResponse(
+            ics_writer.iter_ics(courses, study_tasks, filters, ics_writer.stable_uids(), dtstamp),
+            media_type="text/calendar",
+            headers=headers,
         )
-        for s in study_tasks:
-            if s.course_id not in allowed_courses:
-                continue
-
-            dtstart = _local_iso_to_dt(s.start_local)
-            dtend   = _local_iso_to_dt(s.end_local)
-
-            ve = Event()
-            ve.add("uid", _uid())
-            ve.add("dtstamp", datetime.utcnow())
-            ve.add("dtstart", dtstart)
-            ve.add("dtend", dtend)
-            ve.add("summary", f"Study — {s.title}")
-            desc = f"Course: {s.course_id}"
-            if s.related_assessment:
-                desc += f"\nRelated: {s.related_assessment}"
-            if s.notes:
-                desc += f"\nNotes: {s.notes}"
-            ve.add("description", desc)
-
-            add_alarm(ve, 10, "Study session starting")
-            cal.add_component(ve)
-
-    ics_bytes = cal.to_ical()
+    with metrics.span("build_events"):
+        parts = ics_writer.render_parts(courses, study_tasks, filters, ics_writer.stable_uids(), dtstamp)
+    with metrics.span("serialize"):
+        body = "".join(parts).encode("utf-8")
+    ics_cache.put(etag, body, len(body))
+    return Response(content=body, media_type="text/calendar", headers=headers)
+
+def _render_course_parts(courses: List[Course]) -> List[tuple[str, str]]:
+    if len(courses) < settings.ICS_BATCH_PARALLEL_MIN_COURSES:
+        return ics_writer.course_parts(courses)
+    # a few chunks per worker keeps the pool busy without pickling per course
+    n_chunks = settings.WORKER_POOL_SIZE * 4
+    size = -(-len(courses) // n_chunks)
+    chunks = [courses[i:i + size] for i in range(0, len(courses), size)]
+    return [p for part in workers.get_pool().map(ics_writer.course_parts, chunks) for p in part]
+
+@router.post("/ics/batch")
+def make_ics_batch(payload: dict):
+    """
+    Body shape:
+    {
+      "calendars": [
+        {"name": "optional label", "courses": [...], "study_tasks": [...], "filters": Filters},
+        ...
+      ]
+    }
+    Returns: application/zip with one .ics per calendar, in request order. Each
+    file matches what POST /ics returns for that calendar's payload.
+
+    Courses shared between calendars (same id and content) are validated and
+    rendered once; distinct courses are rendered in the worker pool for large batches.
+    A calendar that lists a course id more than once is rendered whole instead,
+    so its repeated events get the same #n UID suffixes /ics gives them.
+    """
+    distinct: Dict[str, int] = {}   # canonical course JSON -> index into `unique`
+    unique: List[Course] = []
+    calendars = []
+    with metrics.span("validate"):
+        for cal in payload.get("calendars", []):
+            idxs = []
+            for raw in cal.get("courses", []):
+                key = json.dumps(raw, sort_keys=True, separators=(",", ":"))
+                if key not in distinct:
+                    distinct[key] = len(unique)
+                    unique.append(Course(**raw))
+                idxs.append(distinct[key])
+            calendars.append((
+                cal.get("name"),
+                idxs,
+                [StudyTask(**s) for s in cal.get("study_tasks", [])],
+                Filters(**cal["filters"]),
+            ))
+
+    with metrics.span("build_events"):
+        parts = _render_course_parts(unique)
+
+    buf = io.BytesIO()
+    # per-calendar assembly is string joins over the parts above, so it counts as serialization
+    with metrics.span("serialize"), zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i, (name, idxs, study_tasks, filters) in enumerate(calendars):
+            courses = [unique[j] for j in idxs]
+            if len({c.id for c in courses}) < len(courses):
+                # event identities include the course id, so only a repeated id can
+                # collide; the shared fragments were rendered without this calendar's UIDs
+                out = ics_writer.render_parts(courses, study_tasks, filters,
+                                              ics_writer.stable_uids(), ics_writer.STABLE_DTSTAMP)
+            else:
+                included = [j for j in idxs if filters.courseInclusion.get(unique[j].id, True)]
+                out = [ics_writer.calendar_header()]
+                if filters.includeLectures:
+                    out.extend(parts[j][0] for j in included)
+                if filters.includeAssignmentsAndExams:
+                    out.extend(parts[j][1] for j in included)
+                allowed = ics_writer.study_allowed_courses(courses, filters)
+                if allowed:
+                    out.extend(ics_writer.study_vevents(
+                        (s for s in study_tasks if s.course_id in allowed),
+                        ics_writer.stable_uids(), ics_writer.STABLE_DTSTAMP,
+                    ))
+                out.append(ics_writer.calendar_footer())
+            label = re.sub(r"[^A-Za-z0-9._-]+", "-", str(name)).strip("-") if name else "syllacal"
+            zf.writestr(f"{i + 1:04d}-{label}.ics", "".join(out).encode("utf-8"))
+
     return Response(
-        content=cal.to_ical(),
-        media_type="text/calendar",
-        headers={"Content-Disposition": 'attachment; filename="syllacal.ics"'}  # <- new filename
+        content=buf.getvalue(),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="syllacal-batch.zip"'},
     )
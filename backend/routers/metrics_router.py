@@ -0,0 +1,17 @@
+# backend/routers/metrics_router.py
+# Prometheus scrape endpoint; mounted at the root (/metrics), not under /api.
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from services import metrics
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics() -> PlainTextResponse:
+    """
+    Request latency by route (syllacal_http_request_duration_seconds), request
+    counts by route and status, and per-stage latency (syllacal_stage_seconds:
+    pdf_open, pdf_page, clean_text, classify, date_parse, validate, build_events,
+    serialize, ...). Empty when SYLLACAL_METRICS=0.
+    """
+    return PlainTextResponse(metrics.registry.exposition(), media_type="text/plain; version=0.0.4")
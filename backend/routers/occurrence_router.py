@@ -0,0 +1,49 @@
+# backend/routers/occurrence_router.py
+# Concrete occurrences for a date range, for the calendar preview.
+from fastapi import APIRouter, HTTPException
+from datetime import date
+from typing import Optional
+from routers.ics_router import Course, StudyTask, Filters
+from services import recurrence
+
+router = APIRouter()
+
+MAX_RANGE_DAYS = 366 * 2
+
+def _default_range(courses, study_tasks) -> tuple[str, str]:
+    # span of everything in the plan; ISO strings compare in date order
+    starts = [mb.start_date for c in courses for mb in c.meeting_blocks]
+    starts += [a.due_datetime_local[:10] for c in courses for a in c.assessments]
+    starts += [s.start_local[:10] for s in study_tasks]
+    ends = [mb.end_date for c in courses for mb in c.meeting_blocks]
+    ends += [a.due_datetime_local[:10] for c in courses for a in c.assessments]
+    ends += [s.end_local[:10] for s in study_tasks]
+    today = date.today().isoformat()
+    return (min(starts, default=today), max(ends, default=today))
+
+@router.post("/occurrences")
+def occurrences(payload: dict, start: Optional[str] = None, end: Optional[str] = None):
+    """
+    Body shape: same as POST /ics.
+    Query: ?start=YYYY-MM-DD&end=YYYY-MM-DD (inclusive). Defaults to the span of
+    the plan's meeting blocks, assessments and study tasks.
+    Returns: {"start", "end", "count", "occurrences": [{id, kind, course_id, title,
+    location, color, start, end}, ...]} in start order, with local "YYYY-MM-DDTHH:MM"
+    times, under the same filters as the .ics export.
+    """
+    courses = [Course(**c) for c in payload.get("courses", [])]
+    study_tasks = [StudyTask(**s) for s in payload.get("study_tasks", [])]
+    filters = Filters(**payload["filters"])
+
+    if start is None or end is None:
+        d_start, d_end = _default_range(courses, study_tasks)
+        start, end = start or d_start, end or d_end
+    try:
+        span = (date.fromisoformat(end) - date.fromisoformat(start)).days
+    except ValueError:
+        raise HTTPException(status_code=422, detail="start and end must be YYYY-MM-DD")
+    if span < 0 or span > MAX_RANGE_DAYS:
+        raise HTTPException(status_code=422, detail=f"range must be 0-{MAX_RANGE_DAYS} days")
+
+    occ = recurrence.expand(courses, study_tasks, filters, start, end)
+    return {"start": start, "end": end, "count": len(occ), "occurrences": recurrence.to_rows(occ)}
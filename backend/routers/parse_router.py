@@ -1,106 +1,283 @@
-from fastapi import APIRouter, UploadFile, File
-from pydantic import BaseModel
-from typing import List, Any
-import pdfplumber, re
-from dateutil import parser as dparse
+from fastapi import APIRouter, UploadFile, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import List, Any, Generator, Iterator
+import asyncio, json, re
 from datetime import datetime
+import settings
+from services import pdf_extract, parse_cache, datetime_norm, metrics, study_scheduler, uploads
+from services.line_classifier import WS_RE, classify, classify_lines
+from routers.ics_router import Course
 
 router = APIRouter()
 
-DAY_RE = r"(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun|M|T|W|R|F)"
-TIME_RE = r"(\d{1,2}:\d{2}\s?(?:AM|PM|am|pm)?)\s*-\s*(\d{1,2}:\d{2}\s?(?:AM|PM|am|pm)?)"
-MEET_RE = re.compile(rf"({DAY_RE}(?:[/, &-]{DAY_RE})*)\s+{TIME_RE}")
-
-DATE_WORDS = r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec|January|February|March|April|May|June|July|August|September|October|November|December)"
-DATE_RE = re.compile(rf"({DATE_WORDS}\s+\d{{1,2}}(?:,\s*\d{{4}})?|\d{{1,2}}/\d{{1,2}}(?:/\d{{2,4}})?)", re.I)
+# bump whenever parsing output changes so cached results from older code are ignored
+PARSER_VERSION = "4"
 
 def _clean_text(text: str) -> List[str]:
-    lines = [re.sub(r"\s+", " ", ln).strip() for ln in text.splitlines()]
-    return [ln for ln in lines if ln]
+    with metrics.span("clean_text"):
+        lines = [WS_RE.sub(" ", ln).strip() for ln in text.splitlines()]
+        return [ln for ln in lines if ln]
 
 def _read_pdf(file: UploadFile) -> str:
-    with pdfplumber.open(file.file) as pdf:
-        pages = []
-        for p in pdf.pages:
-            t = p.extract_text() or ""
-            pages.append(t)
-        return "\n".join(pages)
+    # blocking, in-process variant; the route goes through the process pool
+    return pdf_extract.extract_text_sync(uploads.pdf_source(file))
+
+def _timeout_detail(f: UploadFile) -> str:
+    return f"Timed out reading {f.filename} after {settings.PDF_FILE_TIMEOUT_S:g}s"
+
+async def _read_pdfs(files: List[UploadFile]) -> List[str]:
+    async def one(f: UploadFile) -> str:
+        try:
+            return await pdf_extract.extract_text(uploads.pdf_source(f))
+        except pdf_extract.ExtractTimeout:
+            raise HTTPException(status_code=504, detail=_timeout_detail(f))
+    # files run concurrently; gather preserves upload order
+    return await asyncio.gather(*(one(f) for f in files))
 
 def _norm_time(t: str) -> str:
     # Return HH:MM 24h as "HH:MM" local-friendly for our ICS code (we localize later)
-    dt = dparse.parse(t)
-    return dt.strftime("%H:%M")
-
-def _infer_semester_dates(lines: List[str]) -> tuple[str, str]:
-    # crude defaults; you can expose UI to override later
-    year = datetime.now().year
-    return (f"{year}-01-06", f"{year}-04-25")
-
-@router.post("/parse")
-async def parse(files: List[UploadFile] = File(...)) -> Any:
-    courses = []
-    for f in files:
-        raw = _read_pdf(f)
-        lines = _clean_text(raw)
+    return datetime_norm.norm_time(t)
+
+# typical term windows (month-day); the UI can override the dates later
+TERM_WINDOWS = {
+    "spring": ("01-06", "04-25"),
+    "summer": ("05-12", "08-08"),
+    "fall": ("09-02", "12-12"),
+    "autumn": ("09-02", "12-12"),
+    "winter": ("01-06", "03-14"),
+}
+TERM_RE = re.compile(
+    r"\b(spring|summer|fall|autumn|winter)(?:\s+(?:semester|term|quarter|session))?,?\s+((?:19|20)\d{2})\b"
+    r"|\b((?:19|20)\d{2})\s+(spring|summer|fall|autumn|winter)\b",
+    re.I,
+)
+
+# the term is looked for in this many leading lines of the document (both endpoints)
+TERM_SCAN_LINES = 40
+
+def _infer_semester_dates(lines: List[str], now: datetime) -> tuple[str, str, int]:
+    # "Fall 2025" / "2025 Spring" near the top picks the term; otherwise spring of this year.
+    # Returns (start date, end date, year); the year also dates year-less due items.
+    for ln in lines[:TERM_SCAN_LINES]:
+        m = TERM_RE.search(ln)
+        if m:
+            term = (m.group(1) or m.group(4)).lower()
+            year = m.group(2) or m.group(3)
+            first, last = TERM_WINDOWS[term]
+            return (f"{year}-{first}", f"{year}-{last}", int(year))
+    year = now.year
+    return (f"{year}-{TERM_WINDOWS['spring'][0]}", f"{year}-{TERM_WINDOWS['spring'][1]}", year)
 
-        # course name: first strong-looking line or a "Course:" line
-        course_name = next((ln.split("Course:")[1].strip() for ln in lines if "Course:" in ln), None)
-        if not course_name:
-            course_name = lines[0][:80] if lines else f.filename
-
-        start_date, end_date = _infer_semester_dates(lines)
-        meetings = []
-        assessments = []
-
-        # meeting blocks
-        for ln in lines:
-            m = MEET_RE.search(ln)
-            if m:
-                days_raw = m.group(1)
-                start_t, end_t = m.group(2), m.group(3)
-                # map single-letter days too
-                day_tokens = re.split(r"[/, &-]+", days_raw)
-                day_map = {"M":"Mon","T":"Tue","W":"Wed","R":"Thu","F":"Fri","S":"Sat","U":"Sun"}
-                norm_days = [day_map.get(d, d) for d in day_tokens]
-                meetings.append({
-                    "days": norm_days,
-                    "start_local": _norm_time(start_t),
-                    "end_local": _norm_time(end_t),
-                    "start_date": start_date,
-                    "end_date": end_date,
-                    "location": "",
-                    "type": "lecture"
-                })
+def _meeting_block(mt, start_date: str, end_date: str) -> dict:
+    return {
+        "days": mt.days,
+        "start_local": _norm_time(mt.start),
+        "end_local": _norm_time(mt.end),
+        "start_date": start_date,
+        "end_date": end_date,
+        "location": "",
+        "type": "lecture"
+    }
 
+def _assessment(due, now: datetime, year: int) -> dict:
+    d = datetime_norm.parse_date(due.date, now, default_year=year)
+    # time: if explicit, parse; else (or if it isn't a real clock time, e.g. "24:00") default 23:59.
+    # Unlike meeting times, a bad one here shouldn't fail the whole upload.
+    hhmm = "23:59"
+    if due.time:
+        try:
+            hhmm = _norm_time(due.time)
+        except (ValueError, OverflowError):
+            pass
+    return {
+        "title": (due.title or "Due Item")[:80],
+        "due_datetime_local": f"{d.isoformat()}T{hhmm}",
+        "category": "assignment",
+        "location": "",
+        "notes": ""
+    }
+
+def _course_header(course_name: str, filename: str) -> dict:
+    course_id = re.sub(r"[^A-Za-z0-9]+", "-", course_name).strip("-")[:24]
+    return {
+        "id": course_id or filename,
+        "name": course_name,
+        "timezone": "America/New_York",
+    }
+
+def _parse_course(lines: List[str], filename: str, now: datetime) -> dict:
+    # one classifier pass yields the header, meeting blocks and due items
+    with metrics.span("classify"):
+        course_name, found_meetings, found_dues = classify_lines(lines)
+
+    # course name: a "Course:" line, else the first strong-looking line
+    if not course_name:
+        course_name = lines[0][:80] if lines else filename
+
+    with metrics.span("date_parse"):
+        start_date, end_date, year = _infer_semester_dates(lines, now)
+        meeting_blocks = [_meeting_block(mt, start_date, end_date) for mt in found_meetings]
         # due items (very simple heuristic)
-        for ln in lines:
-            if re.search(r"\b(due|deadline|exam|quiz|project|milestone|presentation|final)\b", ln, re.I):
-                date_match = DATE_RE.search(ln)
-                if date_match:
-                    dt = dparse.parse(date_match.group(1), fuzzy=True, default=datetime.now())
-                    # time: if explicit, parse; else default 23:59
-                    time_match = re.search(r"\d{1,2}:\d{2}\s?(?:AM|PM|am|pm)?", ln)
-                    if not time_match:
-                        dt = dt.replace(hour=23, minute=59)
-                    title = re.sub(r"\s+", " ", re.sub(DATE_RE, "", ln)).strip()
-                    if not title: title = "Due Item"
-                    assessments.append({
-                        "title": title[:80],
-                        "due_datetime_local": dt.strftime("%Y-%m-%dT%H:%M"),
-                        "category": "assignment",
-                        "location": "",
-                        "notes": ""
-                    })
-
-        course_id = re.sub(r"[^A-Za-z0-9]+", "-", course_name).strip("-")[:24]
-        courses.append({
-            "id": course_id or f.filename,
-            "name": course_name,
-            "timezone": "America/New_York",
-            "meeting_blocks": meetings,
-            "assessments": assessments,
-            "office_hours": []
-        })
-
-    # trivial initial study tasks (you can regenerate in frontend later)
-    return {"courses": courses, "study_tasks": []}
+        assessments = [_assessment(due, now, year) for due in found_dues]
+    return {
+        **_course_header(course_name, filename),
+        "meeting_blocks": meeting_blocks,
+        "assessments": assessments,
+        "office_hours": []
+    }
+
+def _cache_lookup(files: List[UploadFile]) -> tuple[List[str], List[Any]]:
+    # hashing (up to UPLOAD_MAX_FILE_BYTES per file) and the disk tier's SQLite
+    # calls block, so the async route runs this in the threadpool
+    keys = [parse_cache.key_for_file(f.file, PARSER_VERSION) for f in files]
+    return keys, [parse_cache.cache.get(k) for k in keys]
+
+def _cache_store(entries: List[tuple[str, dict]]) -> None:
+    for k, course in entries:
+        parse_cache.cache.put(k, course)
+
+@router.post("/parse", openapi_extra=uploads.UPLOAD_OPENAPI)
+async def parse(files: List[UploadFile] = Depends(uploads.pdf_uploads)) -> Any:
+    """
+    Multipart "files" (PDFs). Size caps are enforced while the body streams in
+    (413); large files are spooled to disk and mapped by the extraction workers.
+    """
+    keys, courses = await run_in_threadpool(_cache_lookup, files)
+
+    # only extract what the cache missed; identical uploads in one batch share a slot
+    todo = {}
+    for i, (k, c) in enumerate(zip(keys, courses)):
+        if c is None:
+            todo.setdefault(k, i)
+    raws = await _read_pdfs([files[i] for i in todo.values()])
+    now = datetime.now()  # one reference time for every date in this request
+    parsed, fresh = {}, []
+    for (k, i), raw in zip(todo.items(), raws):
+        lines = _clean_text(raw)
+        parsed[k] = _parse_course(lines, files[i].filename, now)
+        # empty text falls back to the filename, which isn't part of the key
+        if lines:
+            fresh.append((k, parsed[k]))
+    if fresh:
+        await run_in_threadpool(_cache_store, fresh)
+    courses = [c if c is not None else parsed[k] for k, c in zip(keys, courses)]
+
+    return {"courses": courses, "study_tasks": _plan_study(courses)}
+
+def _plan_study(courses: List[dict]) -> List[dict]:
+    # initial plan; the client can re-plan after edits via /study/schedule
+    with metrics.span("study_schedule"):
+        return study_scheduler.schedule([Course(**c) for c in courses]).study_tasks
+
+def _ndjson(obj: dict) -> bytes:
+    return (json.dumps(obj, separators=(",", ":")) + "\n").encode()
+
+def _stream_course(idx: int, f: UploadFile, now: datetime) -> Generator[bytes, None, dict]:
+    """
+    Page-by-page pipeline for one upload: pages -> cleaned lines -> classifier
+    -> NDJSON events. Only the current page's lines are held in memory; the
+    course header is emitted last since it may come from any page. Returns the
+    parsed course.
+    """
+    key = parse_cache.key_for_file(f.file, PARSER_VERSION)
+    cached = parse_cache.cache.get(key)
+    yield _ndjson({"event": "file", "file": idx, "filename": f.filename, "cached": cached is not None})
+    if cached is not None:
+        for mb in cached["meeting_blocks"]:
+            yield _ndjson({"event": "meeting_block", "file": idx, "data": mb})
+        for a in cached["assessments"]:
+            yield _ndjson({"event": "assessment", "file": idx, "data": a})
+        header = {k: v for k, v in cached.items() if k not in ("meeting_blocks", "assessments")}
+        yield _ndjson({"event": "course", "file": idx, "data": header})
+        return cached
+
+    first_line = course_name = None
+    meetings, assessments = [], []  # kept only to fill the cache, not the stream
+    term = None
+
+    def page_events(page_no: int, page_lines: List[str]) -> List[bytes]:
+        # a page's events are built first and then sent, so the span doesn't time the client
+        nonlocal first_line, course_name
+        start_date, end_date, year = term
+        events = []
+        with metrics.span("classify"):
+            for ln in page_lines:
+                if first_line is None:
+                    first_line = ln
+                info = classify(ln)
+                if not info.kind:
+                    continue
+                if info.course_name is not None and course_name is None:
+                    course_name = info.course_name
+                if info.meeting is not None:
+                    mb = _meeting_block(info.meeting, start_date, end_date)
+                    meetings.append(mb)
+                    events.append(_ndjson({"event": "meeting_block", "file": idx, "page": page_no, "data": mb}))
+                if info.due is not None:
+                    a = _assessment(info.due, now, year)
+                    assessments.append(a)
+                    events.append(_ndjson({"event": "assessment", "file": idx, "page": page_no, "data": a}))
+        return events
+
+    # pages are held back only until TERM_SCAN_LINES lines have been seen, so the
+    # term comes from the same lines /parse looks at (usually just the first page)
+    head: List[str] = []
+    held = []
+    # spooled uploads are read through an mmap, not copied
+    with uploads.open_reader(f) as reader:
+        for page_no, text in enumerate(pdf_extract.iter_page_texts(reader), start=1):
+            held.append((page_no, _clean_text(text)))
+            if term is None:
+                head.extend(held[-1][1][:TERM_SCAN_LINES - len(head)])
+                if len(head) < TERM_SCAN_LINES:
+                    continue
+                term = _infer_semester_dates(head, now)
+            for held_no, held_lines in held:
+                yield from page_events(held_no, held_lines)
+            held = []
+    if held:
+        # shorter than TERM_SCAN_LINES: the whole document was the head
+        term = _infer_semester_dates(head, now)
+        for held_no, held_lines in held:
+            yield from page_events(held_no, held_lines)
+
+    # same fallbacks as _parse_course: first "Course:" line, else first line, else filename
+    if not course_name:
+        course_name = first_line[:80] if first_line else f.filename
+    header = _course_header(course_name, f.filename)
+    yield _ndjson({"event": "course", "file": idx, "data": {**header, "office_hours": []}})
+    course = {**header, "meeting_blocks": meetings, "assessments": assessments, "office_hours": []}
+    if first_line is not None:
+        parse_cache.cache.put(key, course)
+    return course
+
+@router.post("/parse/stream", openapi_extra=uploads.UPLOAD_OPENAPI)
+def parse_stream(files: List[UploadFile] = Depends(uploads.pdf_uploads)) -> StreamingResponse:
+    """
+    NDJSON variant of /parse. Emits, per file in upload order:
+      {"event":"file", ...}, then {"event":"meeting_block"|"assessment", "page":n, "data":{...}}
+      as each page is read, then {"event":"course","data":{id,name,timezone,office_hours}};
+    and finally {"event":"done","study_tasks":[...]} with the planned study sessions.
+    A file that can't be read (not a PDF, or past PDF_FILE_TIMEOUT_S) ends with
+    {"event":"error","file":idx,"detail":...} instead of "course": drop the events
+    already sent for it. The other files, and "done", still follow; the status
+    is 200 once the stream has started.
+    """
+    now = datetime.now()
+    def events() -> Iterator[bytes]:
+        courses = []
+        for idx, f in enumerate(files):
+            try:
+                courses.append((yield from _stream_course(idx, f, now)))
+            except pdf_extract.ExtractTimeout:
+                yield _ndjson({"event": "error", "file": idx, "detail": _timeout_detail(f)})
+            except Exception as e:  # noqa: BLE001 - reported in the stream; a 500 can't be sent mid-body
+                yield _ndjson({"event": "error", "file": idx, "detail": f"Could not read {f.filename}: {e}"})
+        yield _ndjson({"event": "done", "study_tasks": _plan_study(courses)})
+    # a sync iterator: Starlette drives it from its threadpool, off the event loop
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@router.get("/parse/cache")
+def parse_cache_stats() -> Any:
+    return parse_cache.cache.stats()
@@ -0,0 +1,33 @@
+# backend/routers/study_router.py
+# Server-side study-session planning around lectures and existing sessions.
+from fastapi import APIRouter, HTTPException
+from routers.ics_router import Course, StudyTask
+from services import study_scheduler
+
+router = APIRouter()
+
+@router.post("/study/schedule")
+def schedule_study(payload: dict):
+    """
+    Body shape:
+    {
+      "courses": [Course...],
+      "study_tasks": [StudyTask...],       # kept as-is; new sessions avoid them
+      "options": {"day_start": "09:00", "day_end": "22:00"}   # optional
+    }
+    Returns: {"study_tasks": [new StudyTask...], "unscheduled": [{course_id, assessment, missing}]}.
+    Sessions per assessment follow study_scheduler.SESSION_PLAN by category.
+    """
+    courses = [Course(**c) for c in payload.get("courses", [])]
+    existing = [StudyTask(**s) for s in payload.get("study_tasks", [])]
+    opts = payload.get("options") or {}
+    day_start = opts.get("day_start", study_scheduler.DAY_START)
+    day_end = opts.get("day_end", study_scheduler.DAY_END)
+    try:
+        if study_scheduler.minutes_of_day(day_start) >= study_scheduler.minutes_of_day(day_end):
+            raise ValueError
+    except ValueError:
+        raise HTTPException(status_code=422, detail="options.day_start/day_end must be HH:MM with start < end")
+
+    plan = study_scheduler.schedule(courses, existing, day_start, day_end)
+    return {"study_tasks": plan.study_tasks, "unscheduled": plan.unscheduled}
@@ -0,0 +1,74 @@
+# backend/services/datetime_norm.py
+# Date/time normalization for parse(): direct conversion of the token shapes
+# DATE_RE / TIME_RE capture, memoized, with dateutil only for leftovers.
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Optional
+
+from services.lazy import lazy_import
+
+dparse = lazy_import("dateutil.parser")  # loaded the first time a token needs it
+
+_CLOCK_RE = re.compile(r"(\d{1,2}):(\d{2})\s?([AaPp][Mm])?")
+_MONTH_DAY_RE = re.compile(r"([A-Za-z]+)\s+(\d{1,2})(?:,\s*(\d{4}))?")
+_NUMERIC_RE = re.compile(r"(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?")
+
+_MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+_MONTH_NAMES = {
+    "jan", "january", "feb", "february", "mar", "march", "apr", "april", "may", "jun", "june",
+    "jul", "july", "aug", "august", "sep", "september", "oct", "october", "nov", "november",
+    "dec", "december",
+}
+
+
+@lru_cache(maxsize=4096)
+def norm_time(token: str) -> str:
+    """ "1:30 PM" -> "13:30", "9:05" -> "09:05"; same results as dateutil for these shapes."""
+    m = _CLOCK_RE.fullmatch(token.strip())
+    if m:
+        h, mi, ampm = int(m.group(1)), int(m.group(2)), m.group(3)
+        if mi < 60 and (h <= 12 if ampm else h < 24) and not (ampm and h == 0):
+            if ampm:
+                h = h % 12 + (12 if ampm[0] in "Pp" else 0)
+            return f"{h:02d}:{mi:02d}"
+    return dparse.parse(token).strftime("%H:%M")
+
+
+def _two_digit_year(yy: int, this_year: int) -> int:
+    # dateutil's rule: pick the century that lands within 50 years of this_year
+    year = yy + this_year // 100 * 100
+    if year >= this_year + 50:
+        year -= 100
+    elif year < this_year - 50:
+        year += 100
+    return year
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(token: str, default_year: int, ref_year: int) -> date:
+    try:
+        m = _MONTH_DAY_RE.fullmatch(token)
+        if m and m.group(1).lower() in _MONTH_NAMES:
+            year = int(m.group(3)) if m.group(3) else default_year
+            return date(year, _MONTHS[m.group(1)[:3].lower()], int(m.group(2)))
+        m = _NUMERIC_RE.fullmatch(token)
+        if m and int(m.group(1)) <= 12:
+            yr = m.group(3)
+            year = default_year if yr is None else (_two_digit_year(int(yr), ref_year) if len(yr) == 2 else int(yr))
+            if yr is None or len(yr) in (2, 4):
+                return date(year, int(m.group(1)), int(m.group(2)))
+    except ValueError:
+        pass  # e.g. "Feb 30": let dateutil decide (and raise) as before
+    return dparse.parse(token, fuzzy=True, default=datetime(default_year, 1, 1)).date()
+
+
+def parse_date(token: str, ref: datetime, default_year: Optional[int] = None) -> date:
+    """
+    Calendar date for a DATE_RE token ("Mar 6", "March 6, 2025", "3/6", "3/6/25").
+    Missing years come from `default_year` (e.g. the syllabus' term), else from
+    `ref`, which callers freeze once per request; two-digit years resolve
+    around ref's year too.
+    """
+    return _parse_date(token, default_year if default_year is not None else ref.year, ref.year)
@@ -0,0 +1,167 @@
+# backend/services/feed_store.py
+# SQLite store of subscribable plans: one row per feed, one row per course.
+import hashlib
+import json
+import secrets
+import sqlite3
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import settings
+
+
+def canonical_json(obj: Any) -> str:
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class StoredCourse(NamedTuple):
+    data: Dict[str, Any]
+    digest: str                     # sha256 of the course's canonical JSON
+
+
+class Plan(NamedTuple):
+    version: int                    # bumped on every change to the feed
+    courses: List[StoredCourse]     # in the order they were submitted
+    study_tasks: List[Dict[str, Any]]
+    filters: Dict[str, Any]
+
+
+class FeedStore:
+    """
+    Plans behind /api/feeds/{token}.ics. Courses are stored individually with
+    a content digest, so a plan update only touches the rows that changed.
+    """
+
+    def __init__(self, path: str):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self.db.executescript("""
+                PRAGMA journal_mode=WAL;
+                CREATE TABLE IF NOT EXISTS feeds (
+                    token TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    study_tasks TEXT NOT NULL,
+                    filters TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS feed_courses (
+                    token TEXT NOT NULL,
+                    course_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    PRIMARY KEY (token, course_id)
+                );
+            """)
+            self.db.commit()
+
+    def create(self, courses: List[Dict[str, Any]], study_tasks: List[Dict[str, Any]],
+               filters: Dict[str, Any]) -> str:
+        token = secrets.token_urlsafe(24)
+        with self._lock:
+            self.db.execute(
+                "INSERT INTO feeds (token, version, study_tasks, filters) VALUES (?, 1, ?, ?)",
+                (token, canonical_json(study_tasks), canonical_json(filters)),
+            )
+            self._write_courses(token, courses)
+            self.db.commit()
+        return token
+
+    def replace(self, token: str, courses: List[Dict[str, Any]], study_tasks: List[Dict[str, Any]],
+                filters: Dict[str, Any]) -> bool:
+        with self._lock:
+            cur = self.db.execute(
+                "UPDATE feeds SET version = version + 1, study_tasks = ?, filters = ? WHERE token = ?",
+                (canonical_json(study_tasks), canonical_json(filters), token),
+            )
+            if cur.rowcount == 0:
+                return False
+            self._write_courses(token, courses)
+            self.db.commit()
+        return True
+
+    def put_course(self, token: str, course: Dict[str, Any]) -> bool:
+        """Insert or update one course, keeping its position if it already exists."""
+        with self._lock:
+            cur = self.db.execute("UPDATE feeds SET version = version + 1 WHERE token = ?", (token,))
+            if cur.rowcount == 0:
+                return False
+            row = self.db.execute(
+                "SELECT position FROM feed_courses WHERE token = ? AND course_id = ?", (token, course["id"])
+            ).fetchone()
+            if row is None:
+                row = self.db.execute(
+                    "SELECT COALESCE(MAX(position) + 1, 0) FROM feed_courses WHERE token = ?", (token,)
+                ).fetchone()
+            text = canonical_json(course)
+            self.db.execute(
+                "INSERT OR REPLACE INTO feed_courses (token, course_id, position, data, digest) VALUES (?, ?, ?, ?, ?)",
+                (token, course["id"], row[0], text, digest(text)),
+            )
+            self.db.commit()
+        return True
+
+    def delete(self, token: str) -> bool:
+        with self._lock:
+            cur = self.db.execute("DELETE FROM feeds WHERE token = ?", (token,))
+            self.db.execute("DELETE FROM feed_courses WHERE token = ?", (token,))
+            self.db.commit()
+        return cur.rowcount > 0
+
+    def version(self, token: str) -> Optional[int]:
+        with self._lock:
+            row = self.db.execute("SELECT version FROM feeds WHERE token = ?", (token,)).fetchone()
+        return row[0] if row else None
+
+    def load(self, token: str) -> Optional[Plan]:
+        with self._lock:
+            feed = self.db.execute(
+                "SELECT version, study_tasks, filters FROM feeds WHERE token = ?", (token,)
+            ).fetchone()
+            if feed is None:
+                return None
+            rows = self.db.execute(
+                "SELECT data, digest FROM feed_courses WHERE token = ? ORDER BY position", (token,)
+            ).fetchall()
+        return Plan(
+            version=feed[0],
+            courses=[StoredCourse(json.loads(d), h) for d, h in rows],
+            study_tasks=json.loads(feed[1]),
+            filters=json.loads(feed[2]),
+        )
+
+    def _write_courses(self, token: str, courses: List[Dict[str, Any]]) -> None:
+        # only rewrite rows whose content (or position) changed
+        existing = {
+            cid: (pos, h) for cid, pos, h in self.db.execute(
+                "SELECT course_id, position, digest FROM feed_courses WHERE token = ?", (token,))
+        }
+        keep = set()
+        for pos, course in enumerate(courses):
+            text = canonical_json(course)
+            h = digest(text)
+            keep.add(course["id"])
+            if existing.get(course["id"]) != (pos, h):
+                self.db.execute(
+                    "INSERT OR REPLACE INTO feed_courses (token, course_id, position, data, digest) VALUES (?, ?, ?, ?, ?)",
+                    (token, course["id"], pos, text, h),
+                )
+        for cid in existing.keys() - keep:
+            self.db.execute("DELETE FROM feed_courses WHERE token = ? AND course_id = ?", (token, cid))
+
+
+_store: Optional[FeedStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> FeedStore:
+    # opened on first use so importing the router doesn't create the db file
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FeedStore(settings.FEED_DB_PATH)
+        return _store
@@ -0,0 +1,270 @@
+# backend/services/ics_writer.py
+# Direct RFC 5545 text writer for /api/ics. Emits the same bytes the
+# icalendar object tree did (property order, TEXT escaping, 75-octet folding)
+# without building Event/Alarm objects per event.
+import uuid
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from services.lazy import lazy_import
+
+pytz = lazy_import("pytz")
+
+TZID = "America/New_York"
+DOW_MAP = {"Mon":"MO", "Tue":"TU", "Wed":"WE", "Thu":"TH", "Fri":"FR", "Sat":"SA", "Sun":"SU"}
+CRLF = "\r\n"
+
+# UIDs are uuid5(UID_NAMESPACE, identity) so the same event keeps its UID across
+# exports, and calendar clients update it in place instead of re-importing.
+UID_NAMESPACE = uuid.UUID("5c1b8a8e-3d0f-4f57-9a43-7f1f0c2a6d11")
+# bump when the rendered output changes, so payload-hash ETags change with it
+FORMAT_VERSION = 2
+# DTSTAMP is pinned so identical payloads render byte-identical calendars
+STABLE_DTSTAMP = "20250101T000000Z"
+
+
+@lru_cache(maxsize=None)
+def tz():
+    """The TZID zone (pytz), built once per process on first use."""
+    return pytz.timezone(TZID)
+
+
+def __getattr__(name: str):
+    # `ics_writer.TZ` still works, without building the zone at import
+    if name == "TZ":
+        return tz()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def escape_text(text: str) -> str:
+    """iCalendar TEXT escaping; order matters (backslash first)."""
+    return (text.replace(r"\N", "\n")
+                .replace("\\", "\\\\")
+                .replace(";", r"\;")
+                .replace(",", r"\,")
+                .replace("\r\n", r"\n")
+                .replace("\n", r"\n"))
+
+
+def fold(line: str, limit: int = 75) -> str:
+    """Fold a content line so no physical line exceeds `limit` octets."""
+    if line.isascii():
+        if len(line) < limit:
+            return line
+        return "\r\n ".join(line[i:i + limit - 1] for i in range(0, len(line), limit - 1))
+    if len(line.encode("utf-8")) < limit:
+        return line
+    out: List[str] = []
+    count = 0
+    for ch in line:
+        n = len(ch.encode("utf-8"))
+        count += n
+        if count >= limit:
+            out.append("\r\n ")
+            count = n
+        out.append(ch)
+    return "".join(out)
+
+
+def _local(dt: datetime) -> str:
+    return dt.strftime("%Y%m%dT%H%M%S")
+
+
+def _utc(dt: datetime) -> str:
+    return dt.strftime("%Y%m%dT%H%M%SZ")
+
+
+def _alarm(minutes_before: int, message: str) -> str:
+    return CRLF.join([
+        "BEGIN:VALARM",
+        "ACTION:DISPLAY",
+        fold("DESCRIPTION:" + escape_text(message)),
+        f"TRIGGER:-PT{minutes_before}M",
+        "END:VALARM",
+    ]) + CRLF
+
+
+LECTURE_ALARM = _alarm(15, "Class starting soon")
+DUE_ALARM = _alarm(30, "Due soon")
+STUDY_ALARM = _alarm(10, "Study session starting")
+
+
+def calendar_header() -> str:
+    return CRLF.join([
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//syllaCal//EN",
+        "X-WR-CALNAME:syllaCal",  # nice to have for some clients
+    ]) + CRLF
+
+
+def calendar_footer() -> str:
+    return "END:VCALENDAR" + CRLF
+
+
+def vevent(uid: str, dtstamp: str, summary: str, start: datetime, end: datetime,
+           description: str, alarm: str, location=None, rrule=None) -> str:
+    """
+    One VEVENT block. Properties follow icalendar's canonical order
+    (SUMMARY, DTSTART, DTEND, DTSTAMP, UID, RRULE), then the rest alphabetically.
+    """
+    lines = [
+        "BEGIN:VEVENT",
+        fold("SUMMARY:" + escape_text(summary)),
+        f"DTSTART;TZID={TZID}:{_local(start)}",
+        f"DTEND;TZID={TZID}:{_local(end)}",
+        "DTSTAMP:" + dtstamp,
+        fold("UID:" + escape_text(uid)),
+    ]
+    if rrule:
+        lines.append(rrule)
+    lines.append(fold("DESCRIPTION:" + escape_text(description)))
+    if location:
+        lines.append(fold("LOCATION:" + escape_text(location)))
+    return CRLF.join(lines) + CRLF + alarm + "END:VEVENT" + CRLF
+
+
+def stable_uids() -> Callable[[str], str]:
+    """
+    UID factory for one export: maps an event identity string to a stable UID.
+    Repeats of the same identity within the export get a #n suffix so two
+    identical rows don't collapse into one event.
+    """
+    seen: Dict[str, int] = {}
+
+    def uid(identity: str) -> str:
+        n = seen.get(identity, 0)
+        seen[identity] = n + 1
+        if n:
+            identity = f"{identity}#{n}"
+        return f"{uuid.uuid5(UID_NAMESPACE, identity)}@syllacal"
+    return uid
+
+
+def lecture_vevents(c, uid: Callable[[str], str], dtstamp: str) -> Iterator[str]:
+    """Recurring lecture VEVENTs for one course."""
+    for mb in c.meeting_blocks:
+        # First occurrence uses the start_date with the specified time
+        start = datetime.fromisoformat(f"{mb.start_date}T{mb.start_local}")
+        end = datetime.fromisoformat(f"{mb.start_date}T{mb.end_local}")
+        # UNTIL must be UTC; use the meeting end time on the final date
+        until = tz().localize(datetime.fromisoformat(f"{mb.end_date}T{mb.end_local}")).astimezone(pytz.UTC)
+        byday = ",".join(DOW_MAP[d] for d in mb.days if d in DOW_MAP)
+        yield vevent(
+            uid(f"lecture|{c.id}|{','.join(mb.days)}|{mb.start_local}|{mb.end_local}|{mb.start_date}"),
+            dtstamp, f"{c.name} Lecture", start, end,
+            f"Course: {c.name} ({c.id})", LECTURE_ALARM,
+            location=mb.location,
+            rrule=f"RRULE:FREQ=WEEKLY;UNTIL={_utc(until)};BYDAY={byday}",
+        )
+
+
+def assessment_vevents(c, uid: Callable[[str], str], dtstamp: str) -> Iterator[str]:
+    """Single VEVENTs for one course's assessments."""
+    for a in c.assessments:
+        dt = datetime.fromisoformat(a.due_datetime_local)
+        desc_lines = [
+            f"Category: {a.category}",
+            f"Course: {c.name} ({c.id})"
+        ]
+        if a.notes:
+            desc_lines.append(f"Notes: {a.notes}")
+        # For deadlines we set a 1-hour block at the due time
+        identity = a.id or f"{a.title}|{a.due_datetime_local}"
+        yield vevent(
+            uid(f"assessment|{c.id}|{identity}"),
+            dtstamp, f"{a.title} — {c.name}", dt, dt + timedelta(hours=1),
+            "\n".join(desc_lines), DUE_ALARM, location=a.location,
+        )
+
+
+def study_vevents(study_tasks, uid: Callable[[str], str], dtstamp: str) -> Iterator[str]:
+    """Single VEVENTs for study tasks (already filtered by the caller)."""
+    for s in study_tasks:
+        desc = f"Course: {s.course_id}"
+        if s.related_assessment:
+            desc += f"\nRelated: {s.related_assessment}"
+        if s.notes:
+            desc += f"\nNotes: {s.notes}"
+        # task ids are only unique within a course, and a feed renders each
+        # course with its own uid factory, so the course is part of the identity
+        identity = s.id or f"{s.title}|{s.start_local}"
+        yield vevent(
+            uid(f"study|{s.course_id}|{identity}"), dtstamp, f"Study — {s.title}",
+            datetime.fromisoformat(s.start_local), datetime.fromisoformat(s.end_local),
+            desc, STUDY_ALARM,
+        )
+
+
+def study_allowed_courses(courses, filters) -> set:
+    """Course ids whose study tasks are exported under `filters`."""
+    if filters.includeStudySessions == "none":
+        return set()
+    if filters.includeStudySessions == "selectedCourses":
+        return set(filters.studyCourses)
+    return {c.id for c in courses if filters.courseInclusion.get(c.id, True)}
+
+
+def course_parts(courses) -> List[Tuple[str, str]]:
+    """
+    (lecture VEVENTs, assessment VEVENTs) text for each course, unfiltered.
+    Module-level so batch exports can run it in the worker pool.
+    """
+    return [(
+        "".join(lecture_vevents(c, stable_uids(), STABLE_DTSTAMP)),
+        "".join(assessment_vevents(c, stable_uids(), STABLE_DTSTAMP)),
+    ) for c in courses]
+
+
+def iter_vevents(courses, study_tasks, filters, uid: Callable[[str], str],
+                 dtstamp: str) -> Iterator[str]:
+    """
+    Serialized VEVENTs for the ics_router models (Course / StudyTask / Filters),
+    honoring the filters exactly as make_ics always has. `uid` is called with
+    each event's identity (course id plus block / assessment / task identity).
+    """
+    included = [c for c in courses if filters.courseInclusion.get(c.id, True)]
+    # ----- Lectures (recurring) -----
+    if filters.includeLectures:
+        for c in included:
+            yield from lecture_vevents(c, uid, dtstamp)
+    # ----- Assessments (single events) -----
+    if filters.includeAssignmentsAndExams:
+        for c in included:
+            yield from assessment_vevents(c, uid, dtstamp)
+    # ----- Study sessions (single events) -----
+    allowed = study_allowed_courses(courses, filters)
+    if allowed:
+        yield from study_vevents((s for s in study_tasks if s.course_id in allowed), uid, dtstamp)
+
+
+def iter_ics(courses, study_tasks, filters, uid: Callable[[str], str], dtstamp: str,
+             chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """
+    The whole calendar as a stream of byte chunks: header, VEVENTs as they are
+    generated, footer. Small events are coalesced up to ~chunk_size so the
+    response isn't one tiny write per event.
+    """
+    buf: List[str] = [calendar_header()]
+    size = len(buf[0])
+    for ev in iter_vevents(courses, study_tasks, filters, uid, dtstamp):
+        buf.append(ev)
+        size += len(ev)
+        if size >= chunk_size:
+            yield "".join(buf).encode("utf-8")
+            buf, size = [], 0
+    buf.append(calendar_footer())
+    yield "".join(buf).encode("utf-8")
+
+
+def render_parts(courses, study_tasks, filters, uid: Callable[[str], str], dtstamp: str) -> List[str]:
+    """The calendar as text pieces (header, VEVENTs, footer), not yet joined."""
+    parts: List[str] = [calendar_header()]
+    parts.extend(iter_vevents(courses, study_tasks, filters, uid, dtstamp))
+    parts.append(calendar_footer())
+    return parts
+
+
+def render(courses, study_tasks, filters, uid: Callable[[str], str], dtstamp: str) -> bytes:
+    return "".join(render_parts(courses, study_tasks, filters, uid, dtstamp)).encode("utf-8")
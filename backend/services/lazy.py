@@ -0,0 +1,75 @@
+# backend/services/lazy.py
+# Deferred imports for the heavy dependencies (pdfplumber, numpy, dateutil,
+# pytz): a stand-in module object from import time, the real import on first
+# attribute access. Keeps `import main` cheap for workers that never touch them.
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+from types import ModuleType
+from typing import Iterable, List
+
+# held for the whole of every lazy import, and by workers.get_pool while it forks:
+# a child forked mid-import would inherit a half-executed module and held locks
+_lock = threading.RLock()
+
+
+def _reset_lock() -> None:
+    global _lock
+    _lock = threading.RLock()
+
+
+os.register_at_fork(after_in_child=_reset_lock)
+
+
+def import_lock() -> threading.RLock:
+    """`with lazy.import_lock(): ...` keeps lazy imports from running meanwhile (e.g. across a fork)."""
+    return _lock
+
+
+class _LazyModule(ModuleType):
+    """
+    Proxy for `name`. The import goes through the regular import system (and its
+    per-module locks), so concurrent first accesses from threadpool threads wait
+    for one complete import instead of seeing a half-executed module, which
+    importlib.util.LazyLoader allows before Python 3.12.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._module = None
+
+    def __getattr__(self, attr: str):
+        # only reached for names the proxy itself doesn't have, i.e. the real module's
+        module = self._module
+        if module is None:
+            with _lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self.__name__)
+                module = self._module
+        return getattr(module, attr)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """`pdfplumber = lazy_import("pdfplumber")` in place of `import pdfplumber`."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    if importlib.util.find_spec(name) is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    return _LazyModule(name)
+
+
+def is_loaded(name: str) -> bool:
+    """True once `name` has been imported (by a lazy proxy or a plain import)."""
+    return name in sys.modules
+
+
+def load(names: Iterable[str]) -> List[str]:
+    """Import the named modules now; returns the ones that weren't loaded before."""
+    fresh = [n for n in names if not is_loaded(n)]
+    for n in fresh:
+        with _lock:
+            importlib.import_module(n)
+    return fresh
@@ -0,0 +1,102 @@
+# backend/services/line_classifier.py
+# Single-pass line classifier for syllabus text: every regex is compiled once at
+# import, and each line is scanned once for all the fields parse() needs.
+import re
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+DAY_RE = r"(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun|M|T|W|R|F)"
+TIME_RE = r"(\d{1,2}:\d{2}\s?(?:AM|PM|am|pm)?)\s*-\s*(\d{1,2}:\d{2}\s?(?:AM|PM|am|pm)?)"
+MEET_RE = re.compile(rf"({DAY_RE}(?:[/, &-]{DAY_RE})*)\s+{TIME_RE}")
+
+DATE_WORDS = r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec|January|February|March|April|May|June|July|August|September|October|November|December)"
+# Same language as DATE_WORDS, but prefix-factored and behind a first-character
+# lookahead so the engine rejects most positions without trying every month.
+_MONTH_RE = r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:tember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)"
+DATE_RE = re.compile(rf"(?=[JFMASONDjfmasond\d])({_MONTH_RE}\s+\d{{1,2}}(?:,\s*\d{{4}})?|\d{{1,2}}/\d{{1,2}}(?:/\d{{2,4}})?)", re.I)
+
+ASSESS_RE = re.compile(r"(?=[dDeEqQpPmMfF])\b(due|deadline|exam|quiz|project|milestone|presentation|final)\b", re.I)
+CLOCK_RE = re.compile(r"\d{1,2}:\d{2}\s?(?:AM|PM|am|pm)?")
+DAY_SPLIT_RE = re.compile(r"[/, &-]+")
+WS_RE = re.compile(r"\s+")
+
+DAY_MAP = {"M": "Mon", "T": "Tue", "W": "Wed", "R": "Thu", "F": "Fri", "S": "Sat", "U": "Sun"}
+
+# line kinds (bit flags; one line can be e.g. both a meeting and an assessment)
+MEETING = 1
+ASSESSMENT = 2
+COURSE_HEADER = 4
+
+
+class Meeting(NamedTuple):
+    days: List[str]        # ["Mon","Wed"]
+    start: str             # raw time token, e.g. "1:30 PM"
+    end: str
+
+
+class Due(NamedTuple):
+    date: str              # raw date token, e.g. "Mar 6" or "3/6/25"
+    time: Optional[str]    # first clock time on the line, e.g. "1:30 PM", if any
+    title: str             # line with the date removed (may be "")
+
+
+class LineInfo(NamedTuple):
+    kind: int
+    meeting: Optional[Meeting] = None
+    due: Optional[Due] = None
+    course_name: Optional[str] = None
+
+
+PLAIN = LineInfo(0)
+
+
+def classify(ln: str) -> LineInfo:
+    """Tag one cleaned line and pull out its fields in a single pass."""
+    kind = 0
+    meeting = due = course_name = None
+
+    if "Course:" in ln:
+        kind |= COURSE_HEADER
+        course_name = ln.split("Course:", 2)[1].strip()
+
+    has_clock = ":" in ln  # cheap gate; both MEET_RE and CLOCK_RE need a colon
+    if has_clock:
+        m = MEET_RE.search(ln)
+        if m:
+            kind |= MEETING
+            days = [DAY_MAP.get(d, d) for d in DAY_SPLIT_RE.split(m.group(1))]
+            meeting = Meeting(days, m.group(2), m.group(3))
+
+    if ASSESS_RE.search(ln):
+        d = DATE_RE.search(ln)
+        if d:
+            kind |= ASSESSMENT
+            title = WS_RE.sub(" ", DATE_RE.sub("", ln)).strip()
+            clock = CLOCK_RE.search(ln) if has_clock else None
+            due = Due(d.group(1), clock.group(0) if clock else None, title)
+
+    if not kind:
+        return PLAIN
+    return LineInfo(kind, meeting, due, course_name)
+
+
+def classify_lines(lines: Iterable[str]) -> Tuple[Optional[str], List[Meeting], List[Due]]:
+    """
+    Classify every line once. Returns (course_name from the first "Course:"
+    line or None, meetings in line order, dues in line order).
+    """
+    course_name = None
+    seen_header = False
+    meetings: List[Meeting] = []
+    dues: List[Due] = []
+    for ln in lines:
+        info = classify(ln)
+        if not info.kind:
+            continue
+        if info.kind & COURSE_HEADER and not seen_header:
+            seen_header = True
+            course_name = info.course_name
+        if info.meeting is not None:
+            meetings.append(info.meeting)
+        if info.due is not None:
+            dues.append(info.due)
+    return course_name, meetings, dues
@@ -0,0 +1,221 @@
+# backend/services/metrics.py
+# Request timing and per-stage spans: Prometheus text exposition for /metrics
+# and an optional Server-Timing header. With SYLLACAL_METRICS=0 spans are a
+# shared no-op and the middleware passes requests straight through.
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+import settings
+
+# seconds; spans range from sub-ms regex passes to multi-second PDFs
+BUCKETS: Tuple[float, ...] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# stage -> [total seconds, count] for the request being handled (Server-Timing)
+_request_stages: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("syllacal_request_stages", default=None)
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "n")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.n = 0
+
+    def observe(self, v: float) -> None:
+        for i, le in enumerate(BUCKETS):
+            if v <= le:
+                self.counts[i] += 1
+                break
+        self.total += v
+        self.n += 1
+
+
+class Registry:
+    """Histograms keyed by (metric name, label tuple); thread-safe, in-process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hist: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], _Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            h = self._hist.get(key)
+            if h is None:
+                h = self._hist[key] = _Histogram()
+            h.observe(value)
+
+    def inc(self, name: str, amount: float = 1.0, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + amount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hist.clear()
+            self._counters.clear()
+
+    def exposition(self) -> str:
+        """Prometheus text format (version 0.0.4)."""
+        with self._lock:
+            hist = {k: (list(h.counts), h.total, h.n) for k, h in self._hist.items()}
+            counters = dict(self._counters)
+        out: List[str] = []
+        seen = set()
+        for (name, labels), (counts, total, n) in sorted(hist.items()):
+            if name not in seen:
+                seen.add(name)
+                out.append(f"# HELP {name} {HELP.get(name, name)}")
+                out.append(f"# TYPE {name} histogram")
+            cum = 0
+            for le, c in zip(BUCKETS, counts):
+                cum += c
+                out.append(f"{name}_bucket{_labels(labels, le=repr(le))} {cum}")
+            out.append(f"{name}_bucket{_labels(labels, le='+Inf')} {n}")
+            out.append(f"{name}_sum{_labels(labels)} {total:.6f}")
+            out.append(f"{name}_count{_labels(labels)} {n}")
+        for (name, labels), v in sorted(counters.items()):
+            if name not in seen:
+                seen.add(name)
+                out.append(f"# HELP {name} {HELP.get(name, name)}")
+                out.append(f"# TYPE {name} counter")
+            out.append(f"{name}{_labels(labels)} {v:g}")
+        return "\n".join(out) + "\n"
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...], **extra: str) -> str:
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+
+STAGE_SECONDS = "syllacal_stage_seconds"
+REQUEST_SECONDS = "syllacal_http_request_duration_seconds"
+REQUESTS_TOTAL = "syllacal_http_requests_total"
+HELP = {
+    STAGE_SECONDS: "Time spent in each processing stage.",
+    REQUEST_SECONDS: "Time from request start to the end of the response body.",
+    REQUESTS_TOTAL: "Requests handled, by route and status.",
+}
+
+registry = Registry()
+
+
+def observe(stage: str, seconds: float) -> None:
+    """Record a stage duration measured elsewhere (e.g. inside a pool worker)."""
+    if not settings.METRICS_ENABLED:
+        return
+    registry.observe(STAGE_SECONDS, seconds, stage=stage)
+    stages = _request_stages.get()
+    if stages is not None:
+        acc = stages.get(stage)
+        if acc is None:
+            stages[stage] = [seconds, 1]
+        else:
+            acc[0] += seconds
+            acc[1] += 1
+
+
+class _Span:
+    __slots__ = ("stage", "t0")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.stage, time.perf_counter() - self.t0)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(stage: str):
+    """`with span("classify"): ...` times the block under `stage`."""
+    return _Span(stage) if settings.METRICS_ENABLED else _NULL_SPAN
+
+
+def _server_timing(stages: Dict[str, List[float]], total: float) -> bytes:
+    parts = [f'{name};dur={acc[0] * 1e3:.2f};desc="x{int(acc[1])}"' for name, acc in stages.items()]
+    parts.append(f"total;dur={total * 1e3:.2f}")
+    return ", ".join(parts).encode("latin-1")
+
+
+def _route_label(scope) -> str:
+    """
+    The matched route's template ("/api/feeds/{token}.ics"), so label values
+    stay bounded. Routes of included routers may carry their path without the
+    router prefix; the prefix is recovered as the part of the request path the
+    route's own pattern doesn't cover.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        return "unmatched"
+    path = scope["path"]
+    regex = getattr(route, "path_regex", None)
+    if regex is not None and not regex.match(path):
+        for i, ch in enumerate(path):
+            if ch == "/" and i and regex.match(path[i:]):
+                return path[:i] + template
+    return template
+
+
+class TimingMiddleware:
+    """
+    Pure ASGI middleware: times each HTTP request (labelled by route template,
+    not raw path) and collects the spans recorded while handling it. With
+    settings.SERVER_TIMING the spans finished before the response headers go out
+    are sent as a Server-Timing header; streamed work after that only reaches /metrics.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        t0 = time.perf_counter()
+        stages: Dict[str, List[float]] = {}
+        token = _request_stages.set(stages)
+        status = 500
+
+        async def send_timed(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.SERVER_TIMING:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(stages, time.perf_counter() - t0)))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            _request_stages.reset(token)
+            path = _route_label(scope)
+            registry.observe(REQUEST_SECONDS, time.perf_counter() - t0, method=scope["method"], route=path)
+            registry.inc(REQUESTS_TOTAL, method=scope["method"], route=path, status=str(status))
@@ -0,0 +1,133 @@
+# backend/services/parse_cache.py
+# Content-addressed cache of parsed course dicts: in-memory LRU + optional SQLite tier.
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Optional
+
+import settings
+from services.lru import SizedLRU
+
+
+def _key(digest: str, parser_version: str) -> str:
+    # semester defaults depend on the current year, so it is part of the key too
+    return f"v{parser_version}:{datetime.now().year}:{digest}"
+
+
+def key_for_file(fp: BinaryIO, parser_version: str, chunk_size: int = 1 << 20) -> str:
+    """Cache key for a seekable file's content, hashed in chunks; rewinds it afterwards."""
+    h = hashlib.sha256()
+    fp.seek(0)
+    for chunk in iter(lambda: fp.read(chunk_size), b""):
+        h.update(chunk)
+    fp.seek(0)
+    return _key(h.hexdigest(), parser_version)
+
+
+class _DiskTier:
+    """SQLite-backed tier; evicts least-recently-used rows past max_bytes."""
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.db = sqlite3.connect(os.path.join(cache_dir, "parse_cache.sqlite3"), check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, atime REAL NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_atime ON entries(atime)")
+        self.db.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self.db.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self.db.execute("UPDATE entries SET atime = ? WHERE key = ?", (time.time(), key))
+        self.db.commit()
+        return row[0]
+
+    def put(self, key: str, blob: bytes) -> None:
+        self.db.execute(
+            "INSERT OR REPLACE INTO entries (key, value, size, atime) VALUES (?, ?, ?, ?)",
+            (key, blob, len(blob), time.time()),
+        )
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        while total > self.max_bytes:
+            row = self.db.execute("SELECT key, size FROM entries ORDER BY atime LIMIT 1").fetchone()
+            if row is None:
+                break
+            self.db.execute("DELETE FROM entries WHERE key = ?", (row[0],))
+            total -= row[1]
+        self.db.commit()
+
+    def clear(self) -> None:
+        self.db.execute("DELETE FROM entries")
+        self.db.commit()
+
+
+class ParseCache:
+    """
+    Two-tier cache for per-file parse results.
+    Values handed out by get() are shared with the cache: treat them as read-only.
+    """
+
+    def __init__(self, max_bytes: int, cache_dir: str = "", disk_max_bytes: int = 0):
+        self._mem = SizedLRU(max_bytes)
+        self._disk = _DiskTier(cache_dir, disk_max_bytes) if cache_dir else None
+        self._disk_lock = threading.Lock()
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._mem.get(key)
+        if value is not None:
+            return value
+        if self._disk is None:
+            self.misses += 1
+            return None
+        with self._disk_lock:
+            blob = self._disk.get(key)
+        if blob is None:
+            self.misses += 1
+            return None
+        self.disk_hits += 1
+        value = json.loads(blob)
+        self._mem.put(key, value, len(blob))
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        blob = json.dumps(value, separators=(",", ":")).encode()
+        self._mem.put(key, value, len(blob))
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.put(key, blob)
+
+    def clear(self) -> None:
+        self._mem.clear()
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        mem = self._mem.stats()
+        return {
+            "hits": mem["hits"],
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": mem["evictions"],
+            "entries": mem["entries"],
+            "bytes": mem["bytes"],
+            "max_bytes": mem["max_bytes"],
+            "disk_enabled": self._disk is not None,
+        }
+
+
+cache = ParseCache(
+    settings.PARSE_CACHE_MAX_BYTES,
+    settings.PARSE_CACHE_DIR,
+    settings.PARSE_CACHE_DISK_MAX_BYTES,
+)
@@ -0,0 +1,195 @@
+# backend/services/pdf_extract.py
+# pdfplumber extraction off the event loop, fanned out over a process pool.
+import asyncio
+import io
+import mmap
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, List, Tuple, Union
+
+import settings
+from services import metrics
+from services.lazy import lazy_import
+from services.workers import get_pool
+
+# bytes, or the path of a spooled upload (mapped rather than read, so large
+# files are neither copied nor pickled to workers)
+Source = Union[bytes, str]
+
+# pdfplumber + pdfminer are ~100 ms of imports; loaded on the first extraction
+# (or by the startup warm-up, before the pool forks)
+pdfplumber = lazy_import("pdfplumber")
+
+class ExtractTimeout(Exception):
+    """A worker task ran past settings.PDF_FILE_TIMEOUT_S."""
+
+
+# ---------- Worker-side (runs in child processes) ----------
+
+@contextmanager
+def _deadline(seconds: float):
+    # The clock starts when the task does, so time queued behind other uploads
+    # doesn't count. SIGALRM interrupts pdfminer (pure Python) even mid-page, so
+    # the worker is freed for the next task instead of grinding on. Signals only
+    # reach the main thread: in-process callers on other threads, and platforms
+    # without setitimer, get the check between pages in _extract_pages only.
+    # pdfplumber re-raises whatever escapes pdfminer as PdfminerException (or may
+    # swallow it), so expiry is recorded in `fired` and re-raised as
+    # ExtractTimeout on the way out, whatever came of the raise in the handler.
+    if not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    message = f"PDF extraction task exceeded {seconds:g}s"
+    fired = False
+
+    def expire(signum, frame):
+        nonlocal fired
+        fired = True
+        raise ExtractTimeout(message)
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    except ExtractTimeout:
+        raise
+    except Exception as e:
+        if fired:
+            raise ExtractTimeout(message) from e
+        raise
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+    if fired:
+        raise ExtractTimeout(message)
+
+
+@contextmanager
+def _open(src: Source):
+    if isinstance(src, str):
+        with open(src, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with pdfplumber.open(mm) as pdf:
+                yield pdf
+    else:
+        with pdfplumber.open(io.BytesIO(src)) as pdf:
+            yield pdf
+
+
+def _page_count(src: Source, timeout_s: float) -> int:
+    with _deadline(timeout_s), _open(src) as pdf:
+        return len(pdf.pages)
+
+
+def _extract_pages(src: Source, start: int, stop: int, max_chars: int,
+                   timeout_s: float) -> Tuple[List[str], List[Tuple[str, float]]]:
+    # each task re-opens the document; pdfplumber objects don't pickle.
+    # Stops early once this chunk alone has max_chars of text. Stage timings
+    # travel back with the text, since a child process can't record into the
+    # parent's metrics. Raises ExtractTimeout past timeout_s (see _deadline).
+    t0 = started = time.perf_counter()
+    with _deadline(timeout_s), _open(src) as pdf:
+        pages = pdf.pages[start:stop]
+        timings = [("pdf_open", time.perf_counter() - t0)]
+        texts, chars = [], 0
+        for p in pages:
+            t0 = time.perf_counter()
+            if t0 - started > timeout_s:
+                raise ExtractTimeout(f"PDF extraction task exceeded {timeout_s:g}s")
+            texts.append(p.extract_text() or "")
+            timings.append(("pdf_page", time.perf_counter() - t0))
+            chars += len(texts[-1])
+            if chars >= max_chars:
+                break
+    return texts, timings
+
+
+def _record(timings: List[Tuple[str, float]]) -> None:
+    for stage, seconds in timings:
+        metrics.observe(stage, seconds)
+
+
+def _join_capped(texts: List[str]) -> str:
+    return "\n".join(texts)[:settings.PDF_MAX_CHARS]
+
+
+def extract_text_sync(src: Source) -> str:
+    """In-process extraction (no pool); same output as extract_text()."""
+    n = min(_page_count(src, settings.PDF_FILE_TIMEOUT_S), settings.PDF_MAX_PAGES)
+    texts, timings = _extract_pages(src, 0, n, settings.PDF_MAX_CHARS, settings.PDF_FILE_TIMEOUT_S)
+    _record(timings)
+    return _join_capped(texts)
+
+def iter_page_texts(fp: BinaryIO) -> Iterator[str]:
+    """
+    Yield page texts one at a time from an open PDF file object (or mmap),
+    up to settings.PDF_MAX_PAGES pages / PDF_MAX_CHARS characters. Each page's
+    parsed layout is released before the next one is read, so memory stays
+    flat regardless of page count.
+    Runs in the caller's thread, where a page can't be interrupted: raises
+    ExtractTimeout before the next page once the time spent extracting (not
+    the time the consumer holds the generator) passes PDF_FILE_TIMEOUT_S.
+    """
+    timeout = settings.PDF_FILE_TIMEOUT_S
+    t0 = time.perf_counter()
+    with metrics.span("pdf_open"):
+        pdf = pdfplumber.open(fp)
+    spent = time.perf_counter() - t0
+    budget = settings.PDF_MAX_CHARS
+    with pdf:
+        for p in pdf.pages[:settings.PDF_MAX_PAGES]:
+            if spent > timeout:
+                raise ExtractTimeout(f"PDF extraction exceeded {timeout:g}s")
+            try:
+                t0 = time.perf_counter()
+                with metrics.span("pdf_page"):
+                    text = p.extract_text() or ""
+                spent += time.perf_counter() - t0
+                yield text[:budget]
+                budget -= len(text) + 1  # +1 for the newline extract_text() would join with
+            finally:
+                p.close()
+            if budget <= 0:
+                return
+
+# ---------- Event-loop side ----------
+
+async def _extract_one(src: Source) -> str:
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    timeout = settings.PDF_FILE_TIMEOUT_S
+    with metrics.span("pdf_page_count"):
+        n = await loop.run_in_executor(pool, _page_count, src, timeout)
+    n = min(n, settings.PDF_MAX_PAGES)
+    step = settings.PDF_PAGES_PER_TASK
+    # chunks go out a pool's worth at a time, each capped at what's left of
+    # PDF_MAX_CHARS, and no further wave is sent once the cap is reached
+    wave = step * settings.WORKER_POOL_SIZE
+    texts: List[str] = []
+    left = settings.PDF_MAX_CHARS
+    for w in range(0, n, wave):
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(pool, _extract_pages, src, i, min(i + step, n), left, timeout)
+            for i in range(w, min(w + wave, n), step)
+        ))
+        # gather keeps submission order, so pages come back in document order
+        for chunk, timings in chunks:
+            _record(timings)
+            texts.extend(chunk)
+        left = settings.PDF_MAX_CHARS - sum(len(t) + 1 for t in texts)
+        if left <= 0:
+            break
+    return _join_capped(texts)
+
+
+async def extract_text(src: Source) -> str:
+    """
+    Extract the text of one PDF with its pages spread across the pool, capped
+    at settings.PDF_MAX_PAGES / PDF_MAX_CHARS.
+    Raises ExtractTimeout when a task (page count, or a chunk of pages) runs
+    past settings.PDF_FILE_TIMEOUT_S in its worker; the worker is interrupted
+    and takes the next task. Time spent queued for a worker isn't counted.
+    """
+    return await _extract_one(src)
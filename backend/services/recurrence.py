@@ -0,0 +1,147 @@
+# backend/services/recurrence.py
+# Expand meeting blocks, assessments and study tasks into concrete occurrence
+# arrays (NumPy datetime64, minute resolution) for a date range.
+from __future__ import annotations
+
+from typing import List, NamedTuple, Optional
+
+from services import ics_writer
+from services.lazy import lazy_import
+
+np = lazy_import("numpy")  # nothing below touches it at import time
+
+LECTURE, ASSESSMENT, STUDY = 0, 1, 2
+KIND_NAMES = ("lecture", "assessment", "study")
+
+# Mon=0 .. Sun=6, matching MeetingBlock.days
+WEEKDAY = {"Mon": 0, "Tue": 1, "Wed": 2, "Thu": 3, "Fri": 4, "Sat": 5, "Sun": 6}
+ASSESSMENT_MINUTES = 60     # assessments show as 1-hour blocks at the due time
+
+
+class Occurrences(NamedTuple):
+    """Parallel arrays, sorted by start. `source` indexes into `labels`."""
+    start: np.ndarray       # datetime64[m], local wall time
+    end: np.ndarray         # datetime64[m]
+    kind: np.ndarray        # int8: LECTURE / ASSESSMENT / STUDY
+    source: np.ndarray      # int32 index into labels
+    labels: List[dict]      # one per source event: id, course_id, title, location, color
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+
+def _minutes(hhmm: List[str]) -> np.ndarray:
+    # "13:30" -> 810; one entry per block, not per occurrence
+    return np.array([int(h) * 60 + int(m) for h, m, *_ in (t.split(":") for t in hhmm)], dtype=np.int64)
+
+
+def weekdays(days: np.ndarray) -> np.ndarray:
+    """Mon=0..Sun=6 for a datetime64[D] array (1970-01-01 was a Thursday)."""
+    return (days.astype(np.int64) + 3) % 7
+
+
+def lecture_times(courses, range_start: np.datetime64, range_end: np.datetime64):
+    """
+    (start, end, block) arrays for every lecture of `courses` between the two
+    dates (datetime64[D], inclusive); `block` indexes the flattened meeting blocks.
+    """
+    blocks = [mb for c in courses for mb in c.meeting_blocks]
+    if not blocks:
+        empty = np.array([], dtype="datetime64[m]")
+        return empty, empty, np.array([], dtype=np.int64)
+    first = np.array([mb.start_date for mb in blocks], dtype="datetime64[D]")
+    last = np.array([mb.end_date for mb in blocks], dtype="datetime64[D]")
+    bits = np.array([sum(1 << WEEKDAY[d] for d in set(mb.days) if d in WEEKDAY) for mb in blocks],
+                    dtype=np.int64)
+    start_min = _minutes([mb.start_local for mb in blocks])
+    end_min = _minutes([mb.end_local for mb in blocks])
+
+    # one (blocks x days) mask: weekday in the block's BYDAY set, within its date window
+    days = np.arange(range_start, range_end + np.timedelta64(1, "D"), dtype="datetime64[D]")
+    wd = weekdays(days)
+    mask = ((bits[:, None] >> wd[None, :]) & 1).astype(bool)
+    # DTSTART is always an instance in RFC 5545, even off the BYDAY pattern
+    mask |= days[None, :] == first[:, None]
+    mask &= (days[None, :] >= first[:, None]) & (days[None, :] <= last[:, None])
+    b_idx, d_idx = np.nonzero(mask)
+
+    day_min = days[d_idx].astype("datetime64[m]")
+    return (day_min + start_min[b_idx].astype("timedelta64[m]"),
+            day_min + end_min[b_idx].astype("timedelta64[m]"),
+            b_idx)
+
+
+def _lectures(courses, range_start: np.datetime64, range_end: np.datetime64, labels: List[dict]):
+    if not any(c.meeting_blocks for c in courses):
+        return None
+    start, end, b_idx = lecture_times(courses, range_start, range_end)
+    base = len(labels)
+    labels.extend({"id": f"lec-{c.id}-{i}", "course_id": c.id, "title": f"{c.name} Lecture",
+                   "location": mb.location or "", "color": c.color}
+                  for i, (c, mb) in enumerate((c, mb) for c in courses for mb in c.meeting_blocks))
+    return start, end, np.full(len(b_idx), LECTURE, dtype=np.int8), (b_idx + base).astype(np.int32)
+
+
+def _singles(kind: int, starts: List[str], ends: Optional[List[str]], new_labels: List[dict],
+             range_start: np.datetime64, range_end: np.datetime64, labels: List[dict]):
+    if not starts:
+        return None
+    s = np.array(starts, dtype="datetime64[m]")
+    e = s + np.timedelta64(ASSESSMENT_MINUTES, "m") if ends is None else np.array(ends, dtype="datetime64[m]")
+    # keep anything overlapping [range_start, range_end]
+    keep = np.nonzero((e >= range_start.astype("datetime64[m]")) &
+                      (s < (range_end + np.timedelta64(1, "D")).astype("datetime64[m]")))[0]
+    base = len(labels)
+    labels.extend(new_labels)
+    return s[keep], e[keep], np.full(len(keep), kind, dtype=np.int8), (keep + base).astype(np.int32)
+
+
+def expand(courses, study_tasks, filters, range_start: str, range_end: str) -> Occurrences:
+    """
+    All occurrences between range_start and range_end (inclusive "YYYY-MM-DD"),
+    honoring the same filters as the .ics export and expanding to the instances a
+    calendar client would show for it: lectures on start_date and then weekly on
+    their days through end_date, assessments as 1-hour blocks at the due time.
+    """
+    r0 = np.datetime64(range_start, "D")
+    r1 = np.datetime64(range_end, "D")
+    included = [c for c in courses if filters.courseInclusion.get(c.id, True)]
+    labels: List[dict] = []
+    parts = []
+
+    if filters.includeLectures:
+        parts.append(_lectures(included, r0, r1, labels))
+    if filters.includeAssignmentsAndExams:
+        pairs = [(c, a) for c in included for a in c.assessments]
+        parts.append(_singles(
+            ASSESSMENT, [a.due_datetime_local for _, a in pairs], None,
+            [{"id": f"ass-{c.id}-{a.id or i}", "course_id": c.id, "title": f"{a.title} — {c.name}",
+              "location": a.location or "", "color": c.color} for i, (c, a) in enumerate(pairs)],
+            r0, r1, labels))
+    allowed = ics_writer.study_allowed_courses(courses, filters)
+    tasks = [s for s in study_tasks if s.course_id in allowed]
+    colors = {c.id: c.color for c in courses}
+    parts.append(_singles(
+        STUDY, [s.start_local for s in tasks], [s.end_local for s in tasks],
+        [{"id": f"study-{s.id or i}", "course_id": s.course_id, "title": f"Study — {s.title}",
+          "location": "", "color": colors.get(s.course_id)} for i, s in enumerate(tasks)],
+        r0, r1, labels))
+
+    parts = [p for p in parts if p is not None]
+    if not parts:
+        empty = np.array([], dtype="datetime64[m]")
+        return Occurrences(empty, empty, np.array([], dtype=np.int8), np.array([], dtype=np.int32), labels)
+    start, end, kind, source = (np.concatenate(cols) for cols in zip(*parts))
+    order = np.argsort(start, kind="stable")
+    return Occurrences(start[order], end[order], kind[order], source[order], labels)
+
+
+def to_rows(occ: Occurrences) -> List[dict]:
+    """JSON-ready rows, one per occurrence, in start order."""
+    starts = np.datetime_as_string(occ.start, unit="m").tolist()
+    ends = np.datetime_as_string(occ.end, unit="m").tolist()
+    kinds = occ.kind.tolist()
+    return [
+        {**occ.labels[src], "id": f"{occ.labels[src]['id']}@{s}", "kind": KIND_NAMES[k], "start": s, "end": e}
+        for s, e, k, src in zip(starts, ends, kinds, occ.source.tolist())
+    ]
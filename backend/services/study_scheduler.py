@@ -0,0 +1,162 @@
+# backend/services/study_scheduler.py
+# Place study sessions before each assessment's due time, around lectures and
+# other sessions, using a sorted-interval index for conflict queries.
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from services import recurrence
+from services.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# category -> (sessions, minutes per session, days before the due date to look)
+SESSION_PLAN: Dict[str, Tuple[int, int, int]] = {
+    "exam": (3, 120, 7),
+    "project": (3, 120, 10),
+    "assignment": (1, 90, 3),
+    "quiz": (1, 60, 3),
+    "milestone": (1, 60, 4),
+}
+DAY_START = "09:00"     # daily study window, local time
+DAY_END = "22:00"
+
+_DAY = 24 * 60
+
+
+def _to_min(iso: str) -> int:
+    # "2025-03-06T12:30" -> minutes since the epoch
+    return int(np.datetime64(iso, "m").astype(np.int64))
+
+
+def _to_iso(m: int) -> str:
+    return str(np.datetime64(m, "m"))
+
+
+def minutes_of_day(t: str) -> int:
+    """Minutes after midnight for "HH:MM"; ValueError if malformed."""
+    h, m = t.split(":")[:2]
+    return int(h) * 60 + int(m)
+
+
+class IntervalIndex:
+    """
+    Busy time as disjoint [start, end) minute intervals kept in two sorted lists.
+    Overlapping or touching input intervals are merged, so every query is a
+    bisection plus a walk over only the intervals it actually collides with.
+    """
+
+    def __init__(self, starts: Iterable[int] = (), ends: Iterable[int] = ()):
+        s = np.fromiter(starts, dtype=np.int64)
+        e = np.fromiter(ends, dtype=np.int64)
+        keep = e > s
+        s, e = s[keep], e[keep]
+        order = np.argsort(s, kind="stable")
+        s, e = s[order], e[order]
+        if len(s):
+            # a new run starts where an interval begins after everything before it ended
+            reach = np.maximum.accumulate(e)
+            new_run = np.empty(len(s), dtype=bool)
+            new_run[0] = True
+            new_run[1:] = s[1:] > reach[:-1]
+            runs = np.flatnonzero(new_run)
+            s = s[runs]
+            e = reach[np.append(runs[1:] - 1, len(reach) - 1)]
+        self.starts: List[int] = s.tolist()
+        self.ends: List[int] = e.tolist()
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def overlaps(self, start: int, end: int) -> bool:
+        """True if [start, end) intersects any busy interval."""
+        i = bisect_right(self.starts, start) - 1
+        if i >= 0 and self.ends[i] > start:
+            return True
+        return i + 1 < len(self.starts) and self.starts[i + 1] < end
+
+    def add(self, start: int, end: int) -> None:
+        """Mark [start, end) busy, merging with any neighbours it touches."""
+        lo = bisect_left(self.ends, start)          # first interval ending at/after start
+        hi = bisect_right(self.starts, end)         # intervals from here on start after end
+        if lo < hi:
+            start = min(start, self.starts[lo])
+            end = max(end, self.ends[hi - 1])
+        self.starts[lo:hi] = [start]
+        self.ends[lo:hi] = [end]
+
+    def latest_free(self, lo: int, hi: int, length: int) -> Optional[int]:
+        """Start of the latest free `length`-minute slot inside [lo, hi), or None."""
+        end = hi
+        i = bisect_left(self.starts, end) - 1       # last interval starting before `end`
+        while end - length >= lo:
+            if i < 0 or self.ends[i] <= end - length:
+                return end - length
+            end = min(end, self.starts[i])
+            i -= 1
+        return None
+
+
+class Schedule(NamedTuple):
+    study_tasks: List[dict]      # StudyTask-shaped dicts, in due order
+    unscheduled: List[dict]      # {"course_id", "assessment", "missing"} for sessions that didn't fit
+
+
+def schedule(courses, existing: Iterable = (), day_start: str = DAY_START, day_end: str = DAY_END) -> Schedule:
+    """
+    Plan study sessions for every assessment of `courses`, per SESSION_PLAN:
+    at most one session per assessment per day, each as late as possible in the
+    daily window on days leading up to the due time. Sessions avoid all lecture
+    occurrences, the `existing` study tasks and each other. Earlier deadlines
+    are planned first.
+    """
+    pending = sorted(
+        ((_to_min(a.due_datetime_local), c, i, a) for c in courses for i, a in enumerate(c.assessments)),
+        key=lambda t: t[0],
+    )
+    if not pending:
+        return Schedule([], [])
+    w0, w1 = minutes_of_day(day_start), minutes_of_day(day_end)
+    lookback = max(days for _, _, days in SESSION_PLAN.values())
+
+    first_day = np.datetime64(pending[0][3].due_datetime_local[:10], "D") - np.timedelta64(lookback, "D")
+    last_day = np.datetime64(pending[-1][3].due_datetime_local[:10], "D")
+    lec_start, lec_end, _ = recurrence.lecture_times(courses, first_day, last_day)
+    existing = list(existing)
+    busy = IntervalIndex(
+        np.concatenate([lec_start.astype(np.int64), [_to_min(s.start_local) for s in existing]]),
+        np.concatenate([lec_end.astype(np.int64), [_to_min(s.end_local) for s in existing]]),
+    )
+
+    tasks, unscheduled = [], []
+    # ids repeat when two courses share an id (e.g. the same PDF uploaded twice);
+    # like ics_writer.stable_uids, repeats get a #n suffix so ids stay unique
+    seen: Dict[str, int] = {}
+    for due, c, i, a in pending:
+        n, length, days = SESSION_PLAN.get(a.category, SESSION_PLAN["assignment"])
+        due_day = due - due % _DAY
+        placed = []
+        for back in range(days + 1):
+            if len(placed) == n:
+                break
+            day = due_day - back * _DAY
+            start = busy.latest_free(day + w0, min(day + w1, due), length)
+            if start is not None:
+                busy.add(start, start + length)
+                placed.append(start)
+        if len(placed) < n:
+            unscheduled.append({"course_id": c.id, "assessment": a.title, "missing": n - len(placed)})
+        key = a.id or str(i)
+        for k, start in enumerate(sorted(placed), start=1):
+            task_id = f"auto-{c.id}-{key}-{k}"
+            n_seen = seen.get(task_id, 0)
+            seen[task_id] = n_seen + 1
+            tasks.append({
+                "id": f"{task_id}#{n_seen}" if n_seen else task_id,
+                "course_id": c.id,
+                "title": f"{a.title} ({k}/{len(placed)})" if len(placed) > 1 else a.title,
+                "start_local": _to_iso(start),
+                "end_local": _to_iso(start + length),
+                "related_assessment": a.title,
+                "notes": None,
+            })
+    return Schedule(tasks, unscheduled)
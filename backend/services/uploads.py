@@ -0,0 +1,206 @@
+# backend/services/uploads.py
+# Multipart PDF uploads read straight off the request stream: size caps are
+# enforced as bytes arrive, small files stay in memory and large ones spool to a
+# named temp file that extraction maps instead of copying.
+import io
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import AsyncIterator, BinaryIO, Iterator, List, Optional, Union
+
+from fastapi import HTTPException, Request, UploadFile
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+import settings
+
+
+def _too_large(detail: str) -> HTTPException:
+    return HTTPException(status_code=413, detail=detail)
+
+
+class _Spool:
+    """One file part: a BytesIO until it outgrows UPLOAD_SPOOL_MAX_BYTES, then a named temp file."""
+
+    def __init__(self):
+        self.fh: BinaryIO = io.BytesIO()
+        self.size = 0
+
+    @property
+    def on_disk(self) -> bool:
+        return not isinstance(self.fh, io.BytesIO)
+
+    def write(self, chunks: List[bytes]) -> None:
+        for data in chunks:
+            if not self.on_disk and self.size + len(data) > settings.UPLOAD_SPOOL_MAX_BYTES:
+                disk = tempfile.NamedTemporaryFile(prefix="syllacal-", suffix=".pdf",
+                                                   dir=settings.UPLOAD_SPOOL_DIR or None)
+                disk.write(self.fh.getbuffer())
+                self.fh = disk
+            self.fh.write(data)
+            self.size += len(data)
+
+
+class _Part:
+    __slots__ = ("field", "filename", "headers", "spool", "pending", "size", "_hname", "_hvalue")
+
+    def __init__(self):
+        self.field = self.filename = None
+        self.headers: List[tuple] = []
+        self.spool: Optional[_Spool] = None
+        self.pending: List[bytes] = []
+        self.size = 0
+        self._hname = self._hvalue = b""
+
+
+async def read_files(request: Request, field: str = "files") -> List[UploadFile]:
+    """
+    The `field` file parts of a multipart request, in order, as UploadFiles.
+    Raises 413 as soon as Content-Length, the running body size or one file's
+    size passes its cap (settings.UPLOAD_MAX_*), before reading any further.
+    Other form fields are ignored.
+    """
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > settings.UPLOAD_MAX_REQUEST_BYTES:
+        raise _too_large(f"Request body exceeds {settings.UPLOAD_MAX_REQUEST_BYTES} bytes")
+    ctype, params = parse_options_header(request.headers.get("content-type", ""))
+    if ctype != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    parts: List[_Part] = []
+    state = {"part": None}
+
+    def on_part_begin():
+        state["part"] = _Part()
+
+    def on_header_field(data, start, end):
+        state["part"]._hname += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["part"]._hvalue += data[start:end]
+
+    def on_header_end():
+        p = state["part"]
+        p.headers.append((p._hname.lower(), p._hvalue))
+        p._hname = p._hvalue = b""
+
+    def on_headers_finished():
+        p = state["part"]
+        _, opts = parse_options_header(dict(p.headers).get(b"content-disposition", b""))
+        p.field = opts.get(b"name", b"").decode("utf-8", "replace")
+        if b"filename" in opts and p.field == field:
+            p.filename = opts[b"filename"].decode("utf-8", "replace")
+            p.spool = _Spool()
+            parts.append(p)
+
+    def on_part_data(data, start, end):
+        p = state["part"]
+        if p.spool is None:
+            return
+        p.size += end - start
+        if p.size > settings.UPLOAD_MAX_FILE_BYTES:
+            raise _too_large(f"{p.filename} exceeds {settings.UPLOAD_MAX_FILE_BYTES} bytes")
+        p.pending.append(bytes(data[start:end]))
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+    })
+
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > settings.UPLOAD_MAX_REQUEST_BYTES:
+                raise _too_large(f"Request body exceeds {settings.UPLOAD_MAX_REQUEST_BYTES} bytes")
+            parser.write(chunk)
+            for p in parts:
+                if p.pending:
+                    # once a spool is on disk, writes go through the threadpool
+                    if p.spool.on_disk or p.spool.size + sum(map(len, p.pending)) > settings.UPLOAD_SPOOL_MAX_BYTES:
+                        await run_in_threadpool(p.spool.write, p.pending)
+                    else:
+                        p.spool.write(p.pending)
+                    p.pending = []
+        parser.finalize()
+    except HTTPException:
+        for p in parts:
+            p.spool.fh.close()
+        raise
+    except Exception:
+        for p in parts:
+            p.spool.fh.close()
+        raise HTTPException(status_code=400, detail="Invalid multipart data")
+
+    files = []
+    for p in parts:
+        p.spool.fh.seek(0)
+        files.append(UploadFile(file=p.spool.fh, size=p.spool.size, filename=p.filename,
+                                headers=Headers(raw=p.headers)))
+    return files
+
+
+async def pdf_uploads(request: Request) -> AsyncIterator[List[UploadFile]]:
+    """Dependency: the request's "files" parts; spooled temp files are removed afterwards."""
+    files = await read_files(request, "files")
+    if not files:
+        raise HTTPException(status_code=422, detail="No files uploaded (expected form field 'files')")
+    try:
+        yield files
+    finally:
+        for f in files:
+            f.file.close()
+
+
+# request body schema for routes that take pdf_uploads, so /docs still shows the form
+UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "required": ["files"],
+            "properties": {"files": {"type": "array", "items": {"type": "string", "format": "binary"}}},
+        }}},
+    },
+}
+
+
+def spooled_path(f: UploadFile) -> Optional[str]:
+    """Path of the temp file backing `f`, if it was spooled to disk."""
+    name = getattr(f.file, "name", None)
+    return name if isinstance(name, str) and os.path.isfile(name) else None
+
+
+def pdf_source(f: UploadFile) -> Union[bytes, str]:
+    """
+    What to give pdf_extract for `f`: the spool path for large files (workers
+    map it; nothing is pickled), else the bytes.
+    """
+    path = spooled_path(f)
+    if path:
+        return path
+    f.file.seek(0)
+    return f.file.read()
+
+
+@contextmanager
+def open_reader(f: UploadFile) -> Iterator[BinaryIO]:
+    """A seekable reader over `f` for in-process parsing: an mmap for spooled files."""
+    path = spooled_path(f)
+    if path is None:
+        f.file.seek(0)
+        yield f.file
+        return
+    f.file.flush()
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield mm
@@ -0,0 +1,98 @@
+# backend/services/warmup.py
+# Post-startup warm-up: load the lazily imported dependencies, build the shared
+# per-process state and fork the worker pool (after the imports, so workers
+# inherit them), while the server is already accepting requests. /api/health
+# reports its progress.
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+import settings
+from services import datetime_norm, ics_writer, lazy, line_classifier, metrics, workers
+
+# what pdf_extract, datetime_norm, ics_writer and recurrence/study_scheduler defer
+HEAVY_MODULES = ("pdfplumber", "dateutil.parser", "pytz", "numpy")
+
+# a few representative syllabus lines, run through the classifier once
+_SAMPLE_LINES = [
+    "CS 101 — Introduction to Computing",
+    "Lectures: Mon/Wed 1:30 PM - 2:45 PM, Room 204",
+    "Homework 1 due Sep 12, 2025 11:59 PM",
+    "Midterm exam 10/14",
+]
+
+_BOOT = time.monotonic()
+_lock = threading.Lock()
+_state: Dict[str, Any] = {
+    "phase": "pending",         # pending -> running -> done | failed; or disabled
+    "seconds": None,
+    "loaded": [],
+    "pool_workers": 0,
+    "error": None,
+}
+
+
+def _prime() -> None:
+    ics_writer.tz()
+    _, meetings, dues = line_classifier.classify_lines(_SAMPLE_LINES)
+    now = datetime.now()
+    for m in meetings:
+        datetime_norm.norm_time(m.start)
+    for d in dues:
+        datetime_norm.parse_date(d.date, now)
+
+
+def warm() -> Dict[str, Any]:
+    """
+    Run the warm-up once per process (later calls just return status()).
+    Failures are recorded, not raised: everything warmed here also loads on
+    first use, only slower.
+    """
+    with _lock:
+        first = _state["phase"] == "pending"
+        if first:
+            _state["phase"] = "running" if settings.WARMUP else "disabled"
+    if not first or not settings.WARMUP:
+        return status()
+
+    t0 = time.perf_counter()
+    loaded: List[str] = []
+    n_workers, error, phase = 0, None, "done"
+    try:
+        loaded = lazy.load(HEAVY_MODULES)
+        _prime()
+        if settings.WARMUP_POOL:
+            n_workers = workers.prestart()
+    except Exception as e:  # noqa: BLE001 - reported via /api/health
+        error, phase = f"{type(e).__name__}: {e}", "failed"
+    seconds = time.perf_counter() - t0
+    metrics.observe("warmup", seconds)
+
+    with _lock:
+        _state.update(phase=phase, seconds=round(seconds, 4), loaded=loaded,
+                      pool_workers=n_workers, error=error)
+    return status()
+
+
+def is_ready() -> bool:
+    """Nothing left to wait for: warm, or warm-up disabled / failed (requests still work, cold)."""
+    return _state["phase"] in ("done", "disabled", "failed")
+
+
+def status() -> Dict[str, Any]:
+    with _lock:
+        state = dict(_state)
+    return {
+        "status": "ok",
+        "warm": state["phase"] == "done",
+        "warmup": state["phase"],
+        "warmup_seconds": state["seconds"],
+        "uptime_seconds": round(time.monotonic() - _BOOT, 3),
+        "pid": os.getpid(),
+        "modules": {name: lazy.is_loaded(name) for name in HEAVY_MODULES},
+        "pool_workers": state["pool_workers"],
+        "error": state["error"],
+    }
+
@@ -0,0 +1,44 @@
+# backend/services/workers.py
+# The process pool CPU-bound work (PDF extraction, batch ICS rendering) runs in.
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import settings
+from services import lazy
+
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    # created on first use. With the fork start method the executor forks all its
+    # workers on the first submit; that happens here, while no lazy import
+    # (services.lazy) is half-done in another thread, or a child could inherit it
+    global _pool
+    with _lock:
+        if _pool is None:
+            pool = ProcessPoolExecutor(max_workers=settings.WORKER_POOL_SIZE)
+            with lazy.import_lock():
+                pool.submit(os.getpid)
+            _pool = pool
+        return _pool
+
+
+def prestart() -> int:
+    """
+    Fork the pool's workers now instead of on the first request (they inherit
+    whatever this process has imported by then) and wait until one answers.
+    Returns the pool size.
+    """
+    get_pool().submit(os.getpid).result()
+    return settings.WORKER_POOL_SIZE
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
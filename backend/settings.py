@@ -0,0 +1,77 @@
+# backend/settings.py
+# Runtime knobs, read once from the environment (SYLLACAL_* vars).
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    return int(raw) if raw not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    return float(raw) if raw not in (None, "") else default
+
+
+# ---------- Worker pool ----------
+
+# processes shared by PDF extraction and batch ICS rendering (0 -> os.cpu_count())
+WORKER_POOL_SIZE = _env_int("SYLLACAL_WORKER_POOL_SIZE", 0) or (os.cpu_count() or 1)
+
+# ---------- PDF extraction ----------
+
+# limit for each extraction task (page count, or one PDF_PAGES_PER_TASK chunk), in
+# seconds, timed in the worker from when the task starts; the worker is interrupted
+PDF_FILE_TIMEOUT_S = _env_float("SYLLACAL_PDF_FILE_TIMEOUT_S", 30.0)
+# pages handed to a worker per task; smaller = more parallelism, more re-opens
+PDF_PAGES_PER_TASK = max(1, _env_int("SYLLACAL_PDF_PAGES_PER_TASK", 8))
+
+# extraction stops after this many pages / characters of text per file
+PDF_MAX_PAGES = max(1, _env_int("SYLLACAL_PDF_MAX_PAGES", 300))
+PDF_MAX_CHARS = max(1, _env_int("SYLLACAL_PDF_MAX_CHARS", 1_000_000))
+
+# ---------- Uploads ----------
+
+# 413 once one file / the whole multipart body goes past these, checked as the body streams in
+UPLOAD_MAX_FILE_BYTES = _env_int("SYLLACAL_UPLOAD_MAX_FILE_BYTES", 25 * 1024 * 1024)
+UPLOAD_MAX_REQUEST_BYTES = _env_int("SYLLACAL_UPLOAD_MAX_REQUEST_BYTES", 100 * 1024 * 1024)
+# files up to this size stay in memory; bigger ones spool to a temp file that workers mmap
+UPLOAD_SPOOL_MAX_BYTES = _env_int("SYLLACAL_UPLOAD_SPOOL_MAX_BYTES", 1024 * 1024)
+UPLOAD_SPOOL_DIR = os.getenv("SYLLACAL_UPLOAD_SPOOL_DIR", "")  # "" -> system temp dir
+
+# ---------- Parse-result cache ----------
+
+# in-memory LRU budget, measured as the JSON size of cached course dicts
+PARSE_CACHE_MAX_BYTES = _env_int("SYLLACAL_PARSE_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+# optional on-disk tier (SQLite file in this dir); empty disables it
+PARSE_CACHE_DIR = os.getenv("SYLLACAL_PARSE_CACHE_DIR", "")
+PARSE_CACHE_DISK_MAX_BYTES = _env_int("SYLLACAL_PARSE_CACHE_DISK_MAX_BYTES", 256 * 1024 * 1024)
+
+# ---------- ICS export ----------
+
+# rendered .ics bodies kept per payload hash (ETag)
+ICS_CACHE_MAX_BYTES = _env_int("SYLLACAL_ICS_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+# batch exports render distinct courses in the worker pool once there are this many
+ICS_BATCH_PARALLEL_MIN_COURSES = _env_int("SYLLACAL_ICS_BATCH_PARALLEL_MIN_COURSES", 64)
+
+# ---------- Subscribable feeds ----------
+
+# SQLite file holding stored plans for /api/feeds
+FEED_DB_PATH = os.getenv("SYLLACAL_FEED_DB_PATH", "syllacal_feeds.sqlite3")
+# rendered per-course VEVENT fragments and whole feed bodies
+FEED_CACHE_MAX_BYTES = _env_int("SYLLACAL_FEED_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+
+# ---------- Metrics ----------
+
+# request/stage timing for /metrics; 0 turns spans and the timing middleware into no-ops
+METRICS_ENABLED = _env_int("SYLLACAL_METRICS", 1) != 0
+# also send per-stage timings to the client as a Server-Timing header (opt-in)
+SERVER_TIMING = _env_int("SYLLACAL_SERVER_TIMING", 0) != 0
+
+# ---------- Startup ----------
+
+# heavy dependencies are imported lazily; after startup a background warm-up loads
+# them and builds shared state, and /api/health reports "warm" once it has finished
+WARMUP = _env_int("SYLLACAL_WARMUP", 1) != 0
+# the warm-up also forks the worker pool, after the imports so workers inherit them
+WARMUP_POOL = _env_int("SYLLACAL_WARMUP_POOL", 1) != 0